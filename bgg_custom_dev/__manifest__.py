@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'BelGoGreen Custom Development',
-    'version': '19.0.1.1.0',
+    'version': '19.0.1.2.0',
     'category': 'Customizations',
     'summary': 'Custom business logic and automation for BelGoGreen',
     'description': """
@@ -18,6 +18,7 @@
         - Dynamic appointment title building
         - Clickable phone number generation
         - Call center partner assignment
+        - Question registry: answers dispatched by stable question code
 
         **Calendar Events (calendar.event)**:
         - Automatic organizer assignment
@@ -27,9 +28,22 @@
         - Internal email protection (call center email replacement)
         - Customer deduplication by phone number
 
+        **Contacts (res.partner)**:
+        - Indexed normalized phone keys (E.164 and last 8 digits) for customer matching
+
         **Project Management (project.project, project.task)**:
         - Document folder naming from sales orders
         - Welcome call deadline calculation (order date + 2 days)
+        - Welcome call deadlines moved when sales orders are re-dated
+
+        **Deferred Automation (bgg.automation.job)**:
+        - Optional queue for the appointment answer rules, processed by a scheduled action
+          (system parameter bgg_custom_dev.async_answer_automation), with retries and failed jobs list
+
+        **Monitoring (bgg.automation.stats)**:
+        - Per-rule wall time, SQL query count and SQL time (p50/p95/p99 per worker, administrators only)
+        - One structured debug record per rule execution (logger odoo.addons.bgg_custom_dev.rules),
+          sampled with the bgg_rule_log_sample_rate configuration option
 
         All business logic includes comprehensive logging for debugging and monitoring.
     """,
@@ -48,10 +62,14 @@
     ],
     'data': [
         # Security
-        # 'security/ir.model.access.csv',
+        'security/ir.model.access.csv',
+
+        # Data
+        'data/ir_cron_data.xml',
 
         # Views
         'views/menu_views.xml',
+        'views/automation_job_views.xml',
     ],
     'installable': True,
     'application': False,
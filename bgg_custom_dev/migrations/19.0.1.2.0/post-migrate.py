@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import api, SUPERUSER_ID
+
+from odoo.addons.bgg_custom_dev.models.calendar_event import (
+    ALL_AUTOMATION_SCOPES,
+    TITLE_PART_FIELDS,
+    TITLE_SMS_ICON,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Fill the structured title parts of existing appointments by parsing their title one last time"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    events = env['calendar.event'].with_context(active_test=False).search([
+        ('x_automation_scope', 'in', ALL_AUTOMATION_SCOPES),
+        ('name', 'like', '/'),
+    ])
+    for event in events:
+        name = event.name
+        values = {'x_title_sms': name.startswith(TITLE_SMS_ICON)}
+        if values['x_title_sms']:
+            name = name[len(TITLE_SMS_ICON):]
+        for field_name, part in zip(TITLE_PART_FIELDS, name.split('/')):
+            values[field_name] = part or False
+        event.with_context(skip_calendar_automation=True).write(values)
+    _logger.info("Filled the title parts of %s appointments", len(events))
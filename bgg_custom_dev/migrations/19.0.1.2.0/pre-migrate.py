@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Commercial group hard-coded by the previous versions of x_studio_commercial
+LEGACY_COMMERCIAL_GROUP_ID = 59
+COMMERCIAL_GROUP_XMLID_PARAM = 'bgg_custom_dev.commercial_group_xmlid'
+
+
+def migrate(cr, version):
+    """
+    Point the Commercial group parameter to the group previously hard-coded by ID, before the
+    now stored x_studio_commercial is computed for the existing events
+    A group without XML ID (e.g. created in Studio) gets bgg_custom_dev.group_commercial
+    """
+    cr.execute("SELECT 1 FROM ir_config_parameter WHERE key = %s", [COMMERCIAL_GROUP_XMLID_PARAM])
+    if cr.rowcount:
+        return
+
+    cr.execute("SELECT 1 FROM res_groups WHERE id = %s", [LEGACY_COMMERCIAL_GROUP_ID])
+    if not cr.rowcount:
+        _logger.warning("Commercial group ID %s not found, commercial field will stay empty until %s is set",
+                        LEGACY_COMMERCIAL_GROUP_ID, COMMERCIAL_GROUP_XMLID_PARAM)
+        return
+
+    cr.execute("""
+        SELECT module, name
+          FROM ir_model_data
+         WHERE model = 'res.groups' AND res_id = %s
+         ORDER BY id
+         LIMIT 1
+    """, [LEGACY_COMMERCIAL_GROUP_ID])
+    row = cr.fetchone()
+    if row:
+        xmlid = '%s.%s' % row
+    else:
+        cr.execute("""
+            INSERT INTO ir_model_data (module, name, model, res_id, noupdate)
+            VALUES ('bgg_custom_dev', 'group_commercial', 'res.groups', %s, TRUE)
+        """, [LEGACY_COMMERCIAL_GROUP_ID])
+        xmlid = 'bgg_custom_dev.group_commercial'
+
+    cr.execute("""
+        INSERT INTO ir_config_parameter (key, value, create_uid, create_date, write_uid, write_date)
+        VALUES (%s, %s, 1, now() AT TIME ZONE 'UTC', 1, now() AT TIME ZONE 'UTC')
+    """, [COMMERCIAL_GROUP_XMLID_PARAM, xmlid])
+    _logger.info("Commercial group parameter set to %s (group ID %s)", xmlid, LEGACY_COMMERCIAL_GROUP_ID)
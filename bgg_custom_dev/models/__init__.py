@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
 
 # Import model extensions
+from . import appointment_question
 from . import appointment_answer_input
 from . import appointment_type
+from . import automation_job
+from . import automation_stats
 from . import calendar_event
+from . import ir_config_parameter
+from . import mail_activity_type
 from . import project_project
 from . import project_task
+from . import res_partner
+from . import res_users
+from . import sale_order
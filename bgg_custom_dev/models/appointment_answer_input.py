@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from collections import defaultdict
+
 from odoo import api, models
 
-_logger = logging.getLogger(__name__)
+from ..tools import automation_rule, filter_new_records, mark_new_records
+from .calendar_event import ALL_AUTOMATION_SCOPES
 
-# Appointment reference constants for automation rules
-ALL_APPOINTMENT_REFS = ['APT-ENERG-CNT', 'APT-ENERG-COM', 'APT-NISOL-CNT', 'APT-NISOL-COM']
-CALL_CENTER_APPOINTMENT_REFS = ['APT-ENERG-CNT', 'APT-NISOL-CNT']
+_logger = logging.getLogger(__name__)
 
 
 class AppointmentAnswerInput(models.Model):
@@ -17,9 +18,9 @@ class AppointmentAnswerInput(models.Model):
     def create(self, vals_list):
         """Override create to trigger automation rules on new appointment answers"""
         records = super(AppointmentAnswerInput, self).create(vals_list)
+        mark_new_records(records)
 
-        for record in records:
-            self._process_appointment_answer(record)
+        self._schedule_appointment_answers(records)
 
         return records
 
@@ -27,57 +28,105 @@ class AppointmentAnswerInput(models.Model):
         """Override write to trigger automation rules on updates"""
         result = super(AppointmentAnswerInput, self).write(vals)
 
-        # Only process if this is a new record (create_date == write_date)
-        for record in self:
-            if record.create_date == record.write_date:
-                self._process_appointment_answer(record)
+        # Only process answers created in this transaction (e.g. completed right after creation)
+        new_records = filter_new_records(self)
+        if new_records:
+            self._schedule_appointment_answers(new_records)
 
         return result
 
-    def _process_appointment_answer(self, record):
-        """Process all automation rules for appointment answers"""
-        self._add_conjoint_as_contact(record)
-        self._update_contact_info(record)
-        self._update_appointment_title(record)
-        self._set_partner_on_behalf(record)
+    def _schedule_appointment_answers(self, records):
+        """
+        Run the automation rules of new answers now, or queue them for the job processing cron
+        when the deferred mode is enabled (system parameter bgg_custom_dev.async_answer_automation)
+        """
+        Job = self.env['bgg.automation.job']
+        if Job._is_async_answers_enabled():
+            Job._enqueue_answers(records)
+        else:
+            self._process_appointment_answers(records)
+
+    def _process_appointment_answers(self, records):
+        """
+        Process all automation rules for appointment answers, grouped by calendar event
+        Each event's rules run once over all of its answers, then the collected updates
+        are applied with one write per partner and one write per event
+        """
+        for event, answers in records.grouped('calendar_event_id').items():
+            if not event:
+                continue
+
+            partner_updates = defaultdict(dict)
+            event_updates = {}
 
-    def _add_conjoint_as_contact(self, record):
+            self._add_conjoint_as_contact(event, answers)
+            self._update_contact_info(event, answers, partner_updates)
+            self._update_appointment_title(event, answers, event_updates)
+            self._set_partner_on_behalf(event, answers, event_updates)
+
+            self._apply_answer_updates(event, partner_updates, event_updates)
+
+    def _apply_answer_updates(self, event, partner_updates, event_updates):
+        """Write the updates collected by the automation rules for one calendar event"""
+        for partner, update_values in partner_updates.items():
+            try:
+                _logger.info("Updating partner %s with fields: %s",
+                           partner.id, list(update_values.keys()))
+                partner.with_context(mail_create_nosubscribe=True).write(update_values)
+            except Exception as e:
+                _logger.error("Update Contact Info - Error updating partner ID %s: %s",
+                            partner.id, str(e), exc_info=True)
+                if self.env.context.get('raise_automation_errors'):
+                    raise
+
+        if event_updates:
+            try:
+                event.with_context(skip_calendar_automation=True).write(event_updates)
+                _logger.info("Updated calendar event ID %s with fields: %s",
+                           event.id, list(event_updates.keys()))
+            except Exception as e:
+                _logger.error("Appointment Answers - Error updating calendar event ID %s: %s",
+                            event.id, str(e), exc_info=True)
+                if self.env.context.get('raise_automation_errors'):
+                    raise
+
+    @automation_rule
+    def _add_conjoint_as_contact(self, event, answers):
         """
         Add conjoint as Contact - Automation Rule
         Creates or updates spouse contact records based on appointment answers
+        Spouse name and phone answers of the same partner are merged into one create/update
         Only applies to appointment types: APT-ENERG-CNT, APT-ENERG-COM, APT-NISOL-CNT, APT-NISOL-COM
         """
-        try:
-            # Check appointment type restriction
-            if not (record.calendar_event_id and record.calendar_event_id.appointment_type_id):
-                return
+        # Check appointment type restriction
+        if event.x_automation_scope not in ALL_AUTOMATION_SCOPES:
+            return
 
-            if not record.calendar_event_id.appointment_type_id.x_appointment_ref:
-                return
+        question_codes = self.env['appointment.question']._get_question_codes()
 
-            if record.calendar_event_id.appointment_type_id.x_appointment_ref not in ALL_APPOINTMENT_REFS:
-                return
+        spouse_data_by_partner = defaultdict(dict)
+        for record in answers:
+            if not record.partner_id or not record.value_text_box:
+                continue
 
-            if not record.partner_id:
-                return
-
-            spouse_data = {}
+            question_code = question_codes.get(record.question_id.id)
 
             # Check if this is the spouse name question
-            if record.question_id.display_name == 'Nom du conjoint' and record.value_text_box:
-                spouse_data['name'] = record.value_text_box
-                _logger.info("Processing spouse name: %s for partner ID %s",
+            if question_code == 'spouse_name':
+                spouse_data_by_partner[record.partner_id]['name'] = record.value_text_box
+                _logger.debug("Processing spouse name: %s for partner ID %s",
                            record.value_text_box, record.partner_id.id)
 
             # Check if this is the spouse phone number question
-            elif record.question_id.display_name == 'Numéro de téléphone du conjoint' and record.value_text_box:
-                spouse_data['phone'] = record.value_text_box
-                _logger.info("Processing spouse phone: %s for partner ID %s",
+            elif question_code == 'spouse_phone':
+                spouse_data_by_partner[record.partner_id]['phone'] = record.value_text_box
+                _logger.debug("Processing spouse phone: %s for partner ID %s",
                            record.value_text_box, record.partner_id.id)
 
-            if spouse_data:
+        for partner, spouse_data in spouse_data_by_partner.items():
+            try:
                 # Check if a spouse already exists
-                domain = [('parent_id', '=', record.partner_id.id)]
+                domain = [('parent_id', '=', partner.id)]
                 if 'name' in spouse_data:
                     domain.append(('name', '=', spouse_data['name']))
 
@@ -90,14 +139,14 @@ class AppointmentAnswerInput(models.Model):
                         _logger.info("Updated existing spouse (ID %s) phone to: %s",
                                    existing_spouse.id, spouse_data['phone'])
                     else:
-                        _logger.info("Spouse already exists (ID %s), no update needed",
+                        _logger.debug("Spouse already exists (ID %s), no update needed",
                                    existing_spouse.id)
 
                 elif 'name' in spouse_data:
                     # Create new spouse contact with all available information
                     create_vals = {
                         'name': spouse_data['name'],
-                        'parent_id': record.partner_id.id,
+                        'parent_id': partner.id,
                         'is_company': False
                     }
                     if 'phone' in spouse_data:
@@ -108,184 +157,159 @@ class AppointmentAnswerInput(models.Model):
                         tracking_disable=True
                     ).create(create_vals)
                     _logger.info("Created new spouse contact (ID %s) '%s' for partner ID %s",
-                               spouse.id, spouse.name, record.partner_id.id)
+                               spouse.id, spouse.name, partner.id)
 
-        except Exception as e:
-            _logger.error("Add Conjoint as Contact - Error processing record ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            except Exception as e:
+                _logger.error("Add Conjoint as Contact - Error processing partner ID %s for event ID %s: %s",
+                            partner.id, event.id, str(e), exc_info=True)
+                if self.env.context.get('raise_automation_errors'):
+                    raise
 
-    def _update_contact_info(self, record):
+    @automation_rule
+    def _update_contact_info(self, event, answers, partner_updates):
         """
         Update Contact Info - Automation Rule
-        Updates partner contact information (address, postal code, city, country) from appointment answers
+        Collects partner contact information (address, postal code, city, country) from appointment answers
+        Values are merged into partner_updates and written once per partner
         Only applies to appointment types: APT-ENERG-CNT, APT-ENERG-COM, APT-NISOL-CNT, APT-NISOL-COM
         """
-        try:
-            # Check appointment type restriction
-            if not (record.calendar_event_id and record.calendar_event_id.appointment_type_id):
-                return
-
-            if not record.calendar_event_id.appointment_type_id.x_appointment_ref:
-                return
-
-            if record.calendar_event_id.appointment_type_id.x_appointment_ref not in ALL_APPOINTMENT_REFS:
-                return
-
-            if not record.partner_id:
-                return
+        # Check appointment type restriction
+        if event.x_automation_scope not in ALL_AUTOMATION_SCOPES:
+            return
+
+        question_codes = self.env['appointment.question']._get_question_codes()
+
+        for record in answers:
+            try:
+                if not record.partner_id:
+                    continue
+
+                question_code = question_codes.get(record.question_id.id)
+                update_values = partner_updates[record.partner_id]
+
+                # Map questions to partner fields
+                if question_code == 'street':
+                    update_values['street'] = record.value_text_box
+                    _logger.info("Updating street for partner ID %s: %s",
+                               record.partner_id.id, record.value_text_box)
+
+                elif question_code == 'zip':
+                    update_values['zip'] = record.value_text_box
+                    _logger.info("Updating zip code for partner ID %s: %s",
+                               record.partner_id.id, record.value_text_box)
+
+                elif question_code == 'city':
+                    update_values['city'] = record.value_text_box
+                    _logger.info("Updating city for partner ID %s: %s",
+                               record.partner_id.id, record.value_text_box)
+
+                elif question_code == 'country' and record.value_answer_id:
+                    # For selection field, use value_answer_id instead of value_text_box
+                    country_name = record.value_answer_id.name.strip()
+                    _logger.debug("Processing country for partner ID %s: '%s'",
+                               record.partner_id.id, country_name)
+
+                    country = self.env['res.country'].search([('name', '=ilike', country_name)], limit=1)
+
+                    if country:
+                        update_values['country_id'] = country.id
+                        _logger.info("Country matched: %s (ID: %s)", country.name, country.id)
+                    else:
+                        _logger.warning("No country found for name: '%s' (Partner ID: %s)",
+                                      country_name, record.partner_id.id)
 
-            update_values = {}
-
-            # Map questions to partner fields
-            if record.question_id.display_name == 'Adresse':
-                update_values['street'] = record.value_text_box
-                _logger.info("Updating street for partner ID %s: %s",
-                           record.partner_id.id, record.value_text_box)
-
-            elif record.question_id.display_name == 'Code Postale':
-                update_values['zip'] = record.value_text_box
-                _logger.info("Updating zip code for partner ID %s: %s",
-                           record.partner_id.id, record.value_text_box)
-
-            elif record.question_id.display_name == 'Ville':
-                update_values['city'] = record.value_text_box
-                _logger.info("Updating city for partner ID %s: %s",
-                           record.partner_id.id, record.value_text_box)
-
-            elif record.question_id.display_name == 'Pays' and record.value_answer_id:
-                # For selection field, use value_answer_id instead of value_text_box
-                country_name = record.value_answer_id.name.strip()
-                _logger.info("Processing country for partner ID %s: '%s'",
-                           record.partner_id.id, country_name)
-
-                country = self.env['res.country'].search([('name', '=ilike', country_name)], limit=1)
-
-                if country:
-                    update_values['country_id'] = country.id
-                    _logger.info("Country matched: %s (ID: %s)", country.name, country.id)
-                else:
-                    _logger.warning("No country found for name: '%s' (Partner ID: %s)",
-                                  country_name, record.partner_id.id)
-
-            # Update the contact if we have any values
-            if update_values:
-                _logger.info("Updating partner %s with fields: %s",
-                           record.partner_id.id, list(update_values.keys()))
-                record.partner_id.with_context(mail_create_nosubscribe=True).write(update_values)
+                # Drop the entry again if this answer did not map to a partner field
+                if not update_values:
+                    del partner_updates[record.partner_id]
 
-        except Exception as e:
-            _logger.error("Update Contact Info - Error processing record ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            except Exception as e:
+                _logger.error("Update Contact Info - Error processing record ID %s: %s",
+                            record.id, str(e), exc_info=True)
+                if self.env.context.get('raise_automation_errors'):
+                    raise
 
-    def _update_appointment_title(self, record):
+    @automation_rule
+    def _update_appointment_title(self, event, answers, event_updates):
         """
         Update Appointment Title - Automation Rule
-        Builds appointment title from various appointment answer fields
-        Format: [SMS Icon]/Client Name/Postal Code/Phone/Need/Seller
+        Stores the title parts from the appointment answers, once per event, and composes the title
+        from them (see CalendarEvent._compose_title)
+        Format: [SMS Icon]Client Name/Postal Code/Phone/Need/Seller
         Only applies to appointment types: APT-ENERG-CNT, APT-ENERG-COM, APT-NISOL-CNT, APT-NISOL-COM
         """
         try:
-            if not (record.partner_id and record.calendar_event_id):
+            # The client components come from the answering partner
+            partner = answers.filtered('partner_id')[-1:].partner_id
+            if not partner:
                 return
 
             # Check appointment type restriction
-            if not record.calendar_event_id.appointment_type_id:
+            if event.x_automation_scope not in ALL_AUTOMATION_SCOPES:
                 return
 
-            if not record.calendar_event_id.appointment_type_id.x_appointment_ref:
-                return
-
-            if record.calendar_event_id.appointment_type_id.x_appointment_ref not in ALL_APPOINTMENT_REFS:
-                return
-
-            # Initialize empty list with 5 elements
-            name_parts = [''] * 5
-
-            # If there's an existing name, try to parse it
-            current_name = record.calendar_event_id.name or ''
-            if current_name and '/' in current_name:
-                current_parts = current_name.split('/')
-                # Copy existing parts, up to the length of our target list
-                for i in range(min(len(current_parts), 5)):
-                    name_parts[i] = current_parts[i]
-
-            # Check for SMS confirmation answer
-            sms_icon = ''
-            sms_question = self.env['appointment.question'].search([
-                ('display_name', '=', 'Confirmation du rendez-vous par SMS')
-            ], limit=1)
-
-            if sms_question:
-                sms_answer = self.env['appointment.answer.input'].search([
-                    ('calendar_event_id', '=', record.calendar_event_id.id),
-                    ('question_id', '=', sms_question.id),
-                    ('value_answer_id', '!=', False)
-                ], limit=1)
-
-                if sms_answer and sms_answer.value_answer_id.name.lower() == 'oui':
-                    sms_icon = '📞'
-                    _logger.info("SMS confirmation detected for calendar event ID %s",
-                               record.calendar_event_id.id)
-
-            # Update specific part based on the question
-            if record.question_id.display_name == 'Besoin':
-                # Get all answers for the same question (will be one for radio, multiple for checkbox)
-                answers = self.env['appointment.answer.input'].search([
-                    ('calendar_event_id', '=', record.calendar_event_id.id),
-                    ('question_id', '=', record.question_id.id),
-                    ('value_answer_id', '!=', False)
-                ])
-                selected_answers = []
-                for answer in answers:
-                    if answer.value_answer_id:
-                        selected_answers.append(answer.value_answer_id.name)
-                name_parts[3] = '+'.join(selected_answers) if selected_answers else ''
-                _logger.info("Updated 'Besoin' field for event ID %s: %s",
-                           record.calendar_event_id.id, name_parts[3])
-
-            elif record.question_id.display_name == 'Code Postale':
-                name_parts[1] = record.value_text_box if record.value_text_box else ''
-                _logger.info("Updated postal code for event ID %s: %s",
-                           record.calendar_event_id.id, name_parts[1])
-
-            # Get other components that don't come from questions
-            name_parts[4] = record.calendar_event_id.user_id.name or name_parts[4]  # Vendeur
-            name_parts[0] = record.partner_id.name or name_parts[0]  # Nom Client
-            name_parts[2] = record.partner_id.phone or name_parts[2]  # Téléphone
-
-            # Format the new title, filter out empty strings and add SMS icon if needed
-            new_title = sms_icon + '/'.join(filter(None, name_parts))
-
-            if new_title and new_title != current_name:
-                record.calendar_event_id.with_context(skip_calendar_automation=True).write({'name': new_title})
-                _logger.info("Updated appointment title for event ID %s: %s",
-                           record.calendar_event_id.id, new_title)
+            question_model = self.env['appointment.question']
+            question_codes = question_model._get_question_codes()
+
+            # Components that don't come from questions
+            title_values = {
+                'x_title_client': partner.name or event.x_title_client,  # Nom Client
+                'x_title_phone': partner.phone or event.x_title_phone,  # Téléphone
+                'x_title_seller': event.user_id.name or event.x_title_seller,  # Vendeur
+            }
+
+            # SMS confirmation, maintained on the event from all of its answers
+            title_values['x_title_sms'] = event.x_sms_confirmed
+            if event.x_sms_confirmed:
+                _logger.debug("SMS confirmation detected for calendar event ID %s", event.id)
+
+            # Update specific parts based on the questions answered in this batch
+            besoin_answers = answers.filtered(lambda a: question_codes.get(a.question_id.id) == 'need')
+            if besoin_answers:
+                # All the needs selected for the event (one for radio, multiple for checkbox)
+                title_values['x_title_need'] = event.x_selected_needs or False
+                _logger.info("Updated 'Besoin' field for event ID %s: %s", event.id, title_values['x_title_need'])
+
+            postal_code_answer = answers.filtered(lambda a: question_codes.get(a.question_id.id) == 'zip')[-1:]
+            if postal_code_answer:
+                title_values['x_title_zip'] = postal_code_answer.value_text_box or False
+                _logger.info("Updated postal code for event ID %s: %s", event.id, title_values['x_title_zip'])
+
+            # Only the parts that change are written, the title is composed from all the parts
+            event_updates.update({
+                field_name: value for field_name, value in title_values.items()
+                if (event[field_name] or False) != (value or False)
+            })
+            new_title = event._compose_title(title_values)
+
+            if new_title and new_title != event.name:
+                event_updates['name'] = new_title
+                _logger.info("Updated appointment title for event ID %s: %s", event.id, new_title)
 
         except Exception as e:
-            _logger.error("Update Appointment Title - Error processing record ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            _logger.error("Update Appointment Title - Error processing event ID %s: %s",
+                        event.id, str(e), exc_info=True)
+            if self.env.context.get('raise_automation_errors'):
+                raise
 
-    def _set_partner_on_behalf(self, record):
+    @automation_rule
+    def _set_partner_on_behalf(self, event, answers, event_updates):
         """
         Set Partner On Behalf - Automation Rule
         Sets the "rendez-vous pris à la place de" field based on appointment answer
+        When several answers target the question, the last one wins
         Only matches partners with "Call Center" category tag
         Only applies to appointment types: APT-ENERG-CNT, APT-NISOL-CNT
         """
-        try:
-            # Only process if this is the relevant question about "on behalf of partner"
-            if not (record.question_id and record.question_id.display_name == 'Rendez-vous pris à la place de'):
-                return
+        question_codes = self.env['appointment.question']._get_question_codes()
 
-            # We need to make sure the record has a calendar_event_id
-            if not (record.calendar_event_id and record.calendar_event_id.appointment_type_id):
-                return
+        # Only process the last answer to the question about "on behalf of partner"
+        record = answers.filtered(lambda a: question_codes.get(a.question_id.id) == 'on_behalf')[-1:]
+        if not record:
+            return
 
+        try:
             # Check appointment type restriction
-            if not record.calendar_event_id.appointment_type_id.x_appointment_ref:
-                return
-
-            if record.calendar_event_id.appointment_type_id.x_appointment_ref not in CALL_CENTER_APPOINTMENT_REFS:
+            if event.x_automation_scope != 'call_center':
                 return
 
             # For dropdown/selection questions, use value_answer_id instead of value_text_box
@@ -305,35 +329,31 @@ class AppointmentAnswerInput(models.Model):
                             ('name', '=ilike', partner_name),
                             ('category_id', 'in', target_category.ids)
                         ], limit=1)
-                        _logger.info("Searching for Call Center partner: '%s'", partner_name)
+                        _logger.debug("Searching for Call Center partner: '%s'", partner_name)
                     else:
                         _logger.warning("Call Center category not found in system")
 
                     # If partner found, update the calendar event
                     if partner:
                         # Only update if the field value has changed
-                        current_partner = record.calendar_event_id.x_studio_rendez_vous_pris_la_place_de
-                        if current_partner != partner:
-                            record.calendar_event_id.with_context(skip_calendar_automation=True).write({
-                                'x_studio_rendez_vous_pris_la_place_de': partner.id
-                            })
+                        if event.x_studio_rendez_vous_pris_la_place_de != partner:
+                            event_updates['x_studio_rendez_vous_pris_la_place_de'] = partner.id
                             _logger.info("Set 'rendez-vous pris la place de' to partner: %s (ID: %s) for event ID %s",
-                                       partner.name, partner.id, record.calendar_event_id.id)
+                                       partner.name, partner.id, event.id)
                     else:
                         # Partner not found - log warning
                         category_name = target_category.name if target_category else 'Category not found'
                         _logger.warning("Partner not found for name: '%s' with category: '%s' (Event ID: %s)",
-                                      partner_name, category_name, record.calendar_event_id.id)
+                                      partner_name, category_name, event.id)
 
             # If no answer provided, clear the field
             else:
-                if record.calendar_event_id.x_studio_rendez_vous_pris_la_place_de:
-                    record.calendar_event_id.with_context(skip_calendar_automation=True).write({
-                        'x_studio_rendez_vous_pris_la_place_de': False
-                    })
-                    _logger.info("Cleared 'rendez-vous pris la place de' field for event ID %s",
-                               record.calendar_event_id.id)
+                if event.x_studio_rendez_vous_pris_la_place_de:
+                    event_updates['x_studio_rendez_vous_pris_la_place_de'] = False
+                    _logger.info("Cleared 'rendez-vous pris la place de' field for event ID %s", event.id)
 
         except Exception as e:
             _logger.error("Set Partner On Behalf - Error processing record ID %s: %s",
                         record.id, str(e), exc_info=True)
+            if self.env.context.get('raise_automation_errors'):
+                raise
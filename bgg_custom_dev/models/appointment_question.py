@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models, tools
+
+# Stable codes of the questionnaire questions used by the automation rules,
+# with the question label used to recognise questions that have no code set yet
+QUESTION_CODES = {
+    'spouse_name': 'Nom du conjoint',
+    'spouse_phone': 'Numéro de téléphone du conjoint',
+    'street': 'Adresse',
+    'zip': 'Code Postale',
+    'city': 'Ville',
+    'country': 'Pays',
+    'need': 'Besoin',
+    'sms_confirmation': 'Confirmation du rendez-vous par SMS',
+    'on_behalf': 'Rendez-vous pris à la place de',
+}
+
+
+class AppointmentQuestion(models.Model):
+    _inherit = 'appointment.question'
+
+    x_question_code = fields.Selection(
+        selection=list(QUESTION_CODES.items()),
+        string='Automation Code',
+        help='Stable code used by the automation rules to recognise this question, whatever its label',
+        index=True,
+        copy=False,
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to invalidate the question registry"""
+        records = super(AppointmentQuestion, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        """Override write to invalidate the question registry when a question is renamed or re-coded"""
+        result = super(AppointmentQuestion, self).write(vals)
+        if 'name' in vals or 'x_question_code' in vals:
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        """Override unlink to invalidate the question registry"""
+        result = super(AppointmentQuestion, self).unlink()
+        self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @tools.ormcache('self.env.lang')
+    def _get_question_codes(self):
+        """
+        Question Registry
+        Maps appointment question IDs to their automation code (see QUESTION_CODES)
+        Questions without an explicit code are matched on their label
+        Cached per database, invalidated when questions are created, renamed, re-coded or deleted
+
+        Returns:
+            dict: {question_id: code}
+        """
+        label_codes = {label: code for code, label in QUESTION_CODES.items()}
+        questions = self.sudo().with_context(active_test=False).search_fetch([
+            '|',
+            ('x_question_code', '!=', False),
+            ('name', 'in', list(label_codes)),
+        ], ['name', 'x_question_code'])
+
+        question_codes = {}
+        for question in questions:
+            code = question.x_question_code or label_codes.get(question.name)
+            if code:
+                question_codes[question.id] = code
+        return question_codes
+
@@ -2,6 +2,10 @@
 
 from odoo import fields, models
 
+# Appointment reference constants for automation rules
+ALL_APPOINTMENT_REFS = ['APT-ENERG-CNT', 'APT-ENERG-COM', 'APT-NISOL-CNT', 'APT-NISOL-COM']
+CALL_CENTER_APPOINTMENT_REFS = ['APT-ENERG-CNT', 'APT-NISOL-CNT']
+
 
 class AppointmentType(models.Model):
     _inherit = 'appointment.type'
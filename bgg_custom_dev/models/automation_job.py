@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# System parameter enabling the deferred processing of appointment answers
+ASYNC_ANSWERS_PARAM = 'bgg_custom_dev.async_answer_automation'
+
+# Number of failed attempts after which a job is moved to the dead letters
+MAX_ATTEMPTS = 3
+
+
+class BggAutomationJob(models.Model):
+    _name = 'bgg.automation.job'
+    _description = 'BelGoGreen Deferred Automation Job'
+    _order = 'id'
+
+    event_id = fields.Many2one(
+        'calendar.event',
+        string='Calendar Event',
+        required=True,
+        index=True,
+        ondelete='cascade',
+    )
+    answer_ids = fields.Many2many(
+        'appointment.answer.input',
+        string='Appointment Answers',
+    )
+    state = fields.Selection(
+        selection=[
+            ('pending', 'Pending'),
+            ('failed', 'Failed'),
+        ],
+        string='Status',
+        default='pending',
+        required=True,
+        index=True,
+        help='Processed jobs are deleted; failed jobs stay until they are retried'
+    )
+    attempt_count = fields.Integer(string='Attempts', default=0)
+    error_message = fields.Text(string='Last Error', readonly=True)
+
+    @api.model
+    def _is_async_answers_enabled(self):
+        return self.env['ir.config_parameter'].sudo().get_param(ASYNC_ANSWERS_PARAM) in ('1', 'True', 'true')
+
+    @api.model
+    def _enqueue_answers(self, answers):
+        """Create one job per calendar event of the answers and wake the job processing cron"""
+        jobs = self.sudo().create([
+            {'event_id': event.id, 'answer_ids': [(6, 0, event_answers.ids)]}
+            for event, event_answers in answers.grouped('calendar_event_id').items()
+            if event
+        ])
+        if jobs:
+            self._trigger_processing()
+        return jobs
+
+    @api.model
+    def _trigger_processing(self):
+        cron = self.env.ref('bgg_custom_dev.ir_cron_process_automation_jobs', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def action_retry(self):
+        """Put failed jobs back in the queue"""
+        self.write({'state': 'pending', 'attempt_count': 0, 'error_message': False})
+        self._trigger_processing()
+        return True
+
+    @api.model
+    def _cron_process_jobs(self, batch_size=100):
+        """
+        Process Automation Jobs - Scheduled Action
+        Runs the appointment answer rules of the queued jobs, in event-grouped batches
+        A job that fails is retried on the next run, and moved to the dead letters (failed)
+        after MAX_ATTEMPTS attempts
+        The rules re-raise their errors (raise_automation_errors context) so that failures reach the queue
+        """
+        cron = self.env['ir.cron']
+        Answer = self.env['appointment.answer.input'].with_context(raise_automation_errors=True)
+        last_id = 0
+        while True:
+            jobs = self.search([('id', '>', last_id), ('state', '=', 'pending')], limit=batch_size)
+            if not jobs:
+                break
+            last_id = jobs[-1].id
+
+            for event, event_jobs in jobs.grouped('event_id').items():
+                try:
+                    with self.env.cr.savepoint():
+                        Answer._process_appointment_answers(event_jobs.answer_ids.exists())
+                    event_jobs.unlink()
+                except Exception as e:
+                    _logger.error("Automation Job - Error processing answers of event ID %s: %s",
+                                event.id, str(e), exc_info=True)
+                    for job in event_jobs:
+                        attempt_count = job.attempt_count + 1
+                        job.write({
+                            'attempt_count': attempt_count,
+                            'error_message': str(e),
+                            'state': 'failed' if attempt_count >= MAX_ATTEMPTS else 'pending',
+                        })
+
+            if not cron._commit_progress(len(jobs)):
+                break
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+from odoo import _, api, models
+from odoo.exceptions import AccessError
+
+from ..tools import get_rule_stats, reset_rule_stats
+
+
+class BggAutomationStats(models.AbstractModel):
+    _name = 'bgg.automation.stats'
+    _description = 'BelGoGreen Automation Rule Statistics'
+
+    @api.model
+    def get_rule_stats(self):
+        """
+        Return the timing and query statistics of the automation rules (p50/p95/p99 per rule)
+        Statistics are kept in memory by each worker: the answer covers the worker serving the call
+        """
+        self._check_stats_access()
+        return get_rule_stats()
+
+    @api.model
+    def reset_rule_stats(self):
+        """Reset the automation rule statistics of the worker serving the call"""
+        self._check_stats_access()
+        reset_rule_stats()
+        return True
+
+    def _check_stats_access(self):
+        if not self.env.is_admin():
+            raise AccessError(_("Only administrators can access the automation rule statistics."))
@@ -2,23 +2,70 @@
 
 import datetime
 import logging
-from odoo import api, fields, models
+from collections import defaultdict
+from odoo import api, fields, models, tools
+
+from ..tools import automation_rule
+from .appointment_type import ALL_APPOINTMENT_REFS, CALL_CENTER_APPOINTMENT_REFS
+from .res_partner import PHONE_SUFFIX_LENGTH, phone_keys
 
 _logger = logging.getLogger(__name__)
 
-# Appointment reference constants for automation rules
-ALL_APPOINTMENT_REFS = ['APT-ENERG-CNT', 'APT-ENERG-COM', 'APT-NISOL-CNT', 'APT-NISOL-COM']
-CALL_CENTER_APPOINTMENT_REFS = ['APT-ENERG-CNT', 'APT-NISOL-CNT']
+# Automation scopes of calendar events, derived from the appointment type reference
+# 'call_center' events are also in the commercial automation scope
+ALL_AUTOMATION_SCOPES = ['commercial', 'call_center']
+
+# System parameter holding the XML ID of the Commercial group used by x_studio_commercial
+# No default: the commercial field stays empty until the parameter is set (the 19.0.1.2.0 migration
+# sets it to the group previously hard-coded by ID)
+COMMERCIAL_GROUP_XMLID_PARAM = 'bgg_custom_dev.commercial_group_xmlid'
+
+# Fields whose change triggers _assign_existing_customer
+ASSIGN_CUSTOMER_TRIGGER_FIELDS = {'partner_ids', 'attendee_ids', 'partner_id', 'x_studio_customer_phone',
+                                  'opportunity_id', 'appointment_type_id'}
+
+# Automation rules run on calendar events, in order, with the fields whose change triggers them on write
+# IMPORTANT: _assign_existing_customer must run BEFORE _update_clickable_from_attendee
+# because it uses x_studio_customer_phone to find customers, and _update_clickable_from_attendee
+# will clear that field if no client attendees exist yet
+# The clickable and call center email rules also listen to the customer assignment trigger fields,
+# so they see the customer attendee that _assign_existing_customer may have added
+CALENDAR_EVENT_RULES = [
+    ('_update_calendar_status_rescheduled', {'start', 'stop', 'start_date', 'stop_date'}),
+    ('_assign_existing_customer', ASSIGN_CUSTOMER_TRIGGER_FIELDS),
+    ('_update_clickable_from_attendee', ASSIGN_CUSTOMER_TRIGGER_FIELDS),
+    ('_replace_call_center_emails', ASSIGN_CUSTOMER_TRIGGER_FIELDS),
+]
+# _create_activity_noshow is not listed: it runs last, only for events whose status changes to no_show
+
+# Structured parts of the appointment title, in title order: Client/Postal Code/Phone/Need/Seller
+TITLE_PART_FIELDS = ['x_title_client', 'x_title_zip', 'x_title_phone', 'x_title_need', 'x_title_seller']
+TITLE_SMS_ICON = '📞'
 
 
 class CalendarEvent(models.Model):
     _inherit = 'calendar.event'
 
-    # Computed field: Commercial (sales rep) from attendees
+    # Stored computed field: which automation rules apply to this event
+    x_automation_scope = fields.Selection(
+        selection=[
+            ('none', 'None'),
+            ('commercial', 'Commercial'),
+            ('call_center', 'Call Center'),
+        ],
+        string='Automation Scope',
+        compute='_compute_automation_scope',
+        store=True,
+        index=True,
+        readonly=True,
+        help='Automation rules applying to this event, derived from the appointment type reference'
+    )
+
+    # Stored computed field: Commercial (sales rep) from attendees
     x_studio_commercial = fields.Char(
         string='Commercial',
         compute='_compute_commercial',
-        store=False,
+        store=True,
         readonly=True
     )
 
@@ -40,78 +87,228 @@ class CalendarEvent(models.Model):
         help='Partner who made the appointment on behalf of the customer (e.g., Call Center agent)'
     )
 
+    # Structured parts of the appointment title, composed by _compose_title
+    x_title_client = fields.Char(string='Title: Client', copy=False)
+    x_title_zip = fields.Char(string='Title: Postal Code', copy=False)
+    x_title_phone = fields.Char(string='Title: Phone', copy=False)
+    x_title_need = fields.Char(string='Title: Need', copy=False)
+    x_title_seller = fields.Char(string='Title: Seller', copy=False)
+    x_title_sms = fields.Boolean(
+        string='Title: SMS Confirmation',
+        copy=False,
+        help='The customer asked for an SMS confirmation (shown as an icon in front of the title)'
+    )
+
+    # Stored aggregates of the appointment answers, maintained by the ORM as answers change
+    x_sms_confirmed = fields.Boolean(
+        string='SMS Confirmation',
+        compute='_compute_answer_aggregates',
+        store=True,
+        help='The customer answered "Oui" to the SMS confirmation question'
+    )
+    x_selected_needs = fields.Char(
+        string='Selected Needs',
+        compute='_compute_answer_aggregates',
+        store=True,
+        help='Options selected for the need (Besoin) questions, joined with "+"'
+    )
+
     @api.model_create_multi
     def create(self, vals_list):
         """Override create to set organizer and trigger automation rules on new calendar events"""
         records = super(CalendarEvent, self).create(vals_list)
 
-        for record in records:
-            # Set organizer to the user who created the event (if not already set and not public user)
-            self._set_initial_organizer(record)
+        # Set organizer to the user who created the event (if not already set and not public user)
+        records._set_initial_organizer()
 
-            # Process other automation rules
-            self._process_calendar_event(record)
+        # Process other automation rules
+        records._process_calendar_event()
+        records.filtered(lambda e: e.appointment_status == 'no_show')._create_activity_noshow()
 
         return records
 
     def write(self, vals):
         """Override write to trigger automation rules on updates"""
-        result = super(CalendarEvent, self).write(vals)
-
         # Skip automation processing if we're already in an automated update
         # to prevent infinite recursion
-        if not self.env.context.get('skip_calendar_automation'):
-            for record in self:
-                self._process_calendar_event(record, vals)
+        if self.env.context.get('skip_calendar_automation'):
+            result = super(CalendarEvent, self).write(vals)
+            self._recompose_titles(vals)
+            return result
+
+        # Capture the events whose status changes to no_show before the write
+        noshow_transitions = self.browse()
+        if vals.get('appointment_status') == 'no_show':
+            noshow_transitions = self.filtered(lambda e: e.appointment_status != 'no_show')
+
+        result = super(CalendarEvent, self).write(vals)
+
+        self._recompose_titles(vals)
+        self._process_calendar_event(vals)
+        noshow_transitions._create_activity_noshow()
 
         return result
 
-    @api.depends('attendee_ids', 'attendee_ids.partner_id', 'appointment_type_id')
+    @api.depends('appointment_type_id.x_appointment_ref')
+    @automation_rule
+    def _compute_automation_scope(self):
+        """
+        Compute Automation Scope - derives the automation scope from the appointment type reference
+        call_center: APT-ENERG-CNT, APT-NISOL-CNT
+        commercial: APT-ENERG-COM, APT-NISOL-COM
+        none: any other appointment type, or no appointment type
+        """
+        for record in self:
+            appointment_ref = record.appointment_type_id.x_appointment_ref
+            if appointment_ref in CALL_CENTER_APPOINTMENT_REFS:
+                record.x_automation_scope = 'call_center'
+            elif appointment_ref in ALL_APPOINTMENT_REFS:
+                record.x_automation_scope = 'commercial'
+            else:
+                record.x_automation_scope = 'none'
+
+    @api.depends('x_automation_scope', 'attendee_ids.partner_id.name',
+                 'attendee_ids.partner_id.user_ids.all_group_ids')
+    @automation_rule
     def _compute_commercial(self):
         """
         Compute Commercial field - finds the sales rep (commercial) from attendees
-        Only applies to specific appointment types (IDs: 2, 4, 19, 20)
-        Looks for attendees whose partner has a user in the Commercial group (ID: 59)
+        Only applies to appointment types: APT-ENERG-CNT, APT-ENERG-COM, APT-NISOL-CNT, APT-NISOL-COM
+        Looks for attendees whose partner has a user in the Commercial group (see _get_commercial_group_id),
+        directly or through an implying group
+        Group membership is resolved for every attendee of the recordset in one query
         """
-        # Appointment types where we look for a commercial
-        valid_appointment_types = [2, 4, 19, 20]
-        # Commercial group ID
-        commercial_group_id = 59
+        commercial_group_id = self._get_commercial_group_id()
+
+        in_scope = self.filtered(lambda e: e.x_automation_scope in ALL_AUTOMATION_SCOPES)
+        if not commercial_group_id:
+            in_scope = self.browse()
+        (self - in_scope).x_studio_commercial = False
+
+        attendee_partners = in_scope.attendee_ids.partner_id
+        commercial_partner_ids = set()
+        if attendee_partners:
+            commercial_partner_ids = {
+                partner.id
+                for [partner] in self.env['res.users'].sudo()._read_group([
+                    ('partner_id', 'in', attendee_partners.ids),
+                    ('all_group_ids', 'in', commercial_group_id),
+                ], groupby=['partner_id'])
+            }
+
+        for record in in_scope:
+            # First attendee whose partner is a commercial
+            commercial_attendee = next(
+                (attendee.partner_id for attendee in record.attendee_ids
+                 if attendee.partner_id.id in commercial_partner_ids),
+                False
+            )
+            record.x_studio_commercial = commercial_attendee.name if commercial_attendee else False
 
+    @api.depends('appointment_answer_input_ids.question_id', 'appointment_answer_input_ids.value_answer_id.name')
+    def _compute_answer_aggregates(self):
+        """
+        Compute Answer Aggregates - SMS confirmation and selected needs from the event's answers
+        Answers of all the events are read together, questions are recognised by their automation code
+        """
+        question_codes = self.env['appointment.question']._get_question_codes()
         for record in self:
-            # Check if the record has one of the specified appointment types
-            if not record.appointment_type_id or record.appointment_type_id.id not in valid_appointment_types:
-                record.x_studio_commercial = False
-                continue
+            sms_answers = []
+            need_names = []
+            for answer in record.appointment_answer_input_ids:
+                if not answer.value_answer_id:
+                    continue
+                question_code = question_codes.get(answer.question_id.id)
+                if question_code == 'sms_confirmation':
+                    sms_answers.append(answer.value_answer_id.name or '')
+                elif question_code == 'need':
+                    need_names.append(answer.value_answer_id.name)
+            # The first SMS answer counts
+            record.x_sms_confirmed = bool(sms_answers) and sms_answers[0].lower() == 'oui'
+            record.x_selected_needs = '+'.join(filter(None, need_names)) or False
+
+    @api.model
+    @tools.ormcache()
+    def _get_commercial_group_id(self):
+        """
+        Return the ID of the Commercial group, resolved from the XML ID stored in the
+        bgg_custom_dev.commercial_group_xmlid system parameter (cached, invalidated when parameters change)
+        Returns False while the parameter is not set
+        """
+        xmlid = self.env['ir.config_parameter'].sudo().get_param(COMMERCIAL_GROUP_XMLID_PARAM)
+        if not xmlid:
+            _logger.debug("Commercial group parameter not set, commercial field will stay empty")
+            return False
+        group = self.env.ref(xmlid, raise_if_not_found=False)
+        if not group or group._name != 'res.groups':
+            _logger.warning("Commercial group '%s' not found, commercial field will stay empty", xmlid)
+            return False
+        return group.id
+
+    @api.model
+    def _recompute_commercial(self):
+        """Recompute the stored commercial of all the events in the automation scope (e.g. after the Commercial group changed)"""
+        events = self.sudo().with_context(active_test=False).search([
+            '|',
+            ('x_automation_scope', 'in', ALL_AUTOMATION_SCOPES),
+            ('x_studio_commercial', '!=', False),
+        ])
+        self.env.add_to_compute(self._fields['x_studio_commercial'], events)
+
+    def _compose_title(self, values=None):
+        """
+        Compose the appointment title from its structured parts
+        Format: [SMS Icon]Client Name/Postal Code/Phone/Need/Seller, empty parts left out
+
+        Args:
+            values: title part values overriding the stored ones (e.g. pending updates)
 
-            commercial_attendee = False
+        Returns:
+            str: the composed title
+        """
+        self.ensure_one()
+        values = values or {}
 
-            # Search through attendees for a commercial
-            for attendee in record.attendee_ids:
-                partner = attendee.partner_id
-                if partner and partner.user_ids:
-                    for user in partner.user_ids:
-                        if commercial_group_id in user.group_ids.ids:
-                            commercial_attendee = partner
-                            break
-                    if commercial_attendee:
-                        break
+        def get_part(field_name):
+            return values[field_name] if field_name in values else self[field_name]
 
-            record.x_studio_commercial = commercial_attendee.name if commercial_attendee else False
+        sms_icon = TITLE_SMS_ICON if get_part('x_title_sms') else ''
+        return sms_icon + '/'.join(filter(None, (get_part(field_name) for field_name in TITLE_PART_FIELDS)))
+
+    def _recompose_titles(self, vals):
+        """
+        Rewrite the title of the events whose parts were written without a title
+        Events are grouped by new title, so that a batch update costs one write per distinct title
 
-    def _process_calendar_event(self, record, vals=None):
-        """Process all automation rules for calendar events"""
+        Args:
+            vals: the values just written
+        """
+        if 'name' in vals or not any(field_name in vals for field_name in TITLE_PART_FIELDS + ['x_title_sms']):
+            return
+
+        events_by_title = defaultdict(lambda: self.browse())
+        for record in self:
+            new_title = record._compose_title()
+            if new_title and new_title != record.name:
+                events_by_title[new_title] |= record
+
+        for new_title, events in events_by_title.items():
+            events.with_context(skip_calendar_automation=True).write({'name': new_title})
+
+    def _process_calendar_event(self, vals=None):
+        """
+        Process automation rules for calendar events
+        On create (vals is None) every rule runs; on write only the rules whose trigger fields
+        intersect the written fields run, each over the whole recordset
+        """
         # Note: Organizer update removed - organizer is set once at creation and never changes
-        self._update_calendar_status_rescheduled(record, vals)
-        # IMPORTANT: _assign_existing_customer must run BEFORE _update_clickable_from_attendee
-        # because it uses x_studio_customer_phone to find customers, and _update_clickable_from_attendee
-        # will clear that field if no client attendees exist yet
-        self._assign_existing_customer(record)
-        self._update_clickable_from_attendee(record)
-        self._replace_call_center_emails(record)
-        self._create_activity_noshow(record)
-
-    def _set_initial_organizer(self, record):
+        for rule_name, trigger_fields in CALENDAR_EVENT_RULES:
+            if vals is not None and trigger_fields.isdisjoint(vals):
+                continue
+            getattr(self, rule_name)()
+
+    @automation_rule
+    def _set_initial_organizer(self):
         """
         Set Initial Organizer on Creation - Automation Rule
         Sets the organizer to the user who created the event (never changes after creation)
@@ -119,490 +316,475 @@ class CalendarEvent(models.Model):
         ALWAYS overrides any organizer set by other modules (like appointments)
         Only applies to appointment types: APT-ENERG-CNT, APT-NISOL-CNT
         """
-        try:
-            # Check appointment type restriction
-            if not record.appointment_type_id:
-                return
-
-            if not record.appointment_type_id.x_appointment_ref:
-                return
-
-            if record.appointment_type_id.x_appointment_ref not in CALL_CENTER_APPOINTMENT_REFS:
-                return
+        for record in self:
+            try:
+                # Check appointment type restriction
+                if record.x_automation_scope != 'call_center':
+                    continue
 
-            # Use the user who created the record as organizer
-            creating_user = record.create_uid
-
-            if creating_user and not creating_user._is_public():
-                # Always set organizer to the creating user, even if already set by other modules
-                if record.user_id != creating_user or record.partner_id != creating_user.partner_id:
-                    record.sudo().with_context(skip_calendar_automation=True).write({
-                        'user_id': creating_user.id,
-                        'partner_id': creating_user.partner_id.id
-                    })
-                    _logger.info("Set organizer to creating user: %s (ID: %s) for event ID %s",
-                               creating_user.name, creating_user.id, record.id)
+                # Use the user who created the record as organizer
+                creating_user = record.create_uid
+
+                if creating_user and not creating_user._is_public():
+                    # Always set organizer to the creating user, even if already set by other modules
+                    if record.user_id != creating_user or record.partner_id != creating_user.partner_id:
+                        record.sudo().with_context(skip_calendar_automation=True).write({
+                            'user_id': creating_user.id,
+                            'partner_id': creating_user.partner_id.id
+                        })
+                        _logger.info("Set organizer to creating user: %s (ID: %s) for event ID %s",
+                                   creating_user.name, creating_user.id, record.id)
+                    else:
+                        _logger.debug("Organizer already matches creating user for event ID %s", record.id)
                 else:
-                    _logger.info("Organizer already matches creating user for event ID %s", record.id)
-            else:
-                _logger.info("Creating user is public or not found, skipping organizer setup for event ID %s", record.id)
+                    _logger.debug("Creating user is public or not found, skipping organizer setup for event ID %s", record.id)
 
-        except Exception as e:
-            _logger.error("Set Initial Organizer - Error processing event ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            except Exception as e:
+                _logger.error("Set Initial Organizer - Error processing event ID %s: %s",
+                            record.id, str(e), exc_info=True)
 
-    def _update_calendar_status_rescheduled(self, record, vals=None):
+    @automation_rule
+    def _update_calendar_status_rescheduled(self):
         """
         Update Calendar Status When Rescheduled - Automation Rule
-        Deletes NoShow activities and posts a chatter note when an event is rescheduled
+        Marks NoShow activities as done (with a chatter note) and resets the no_show status when events are rescheduled
+        Works on the whole recordset: one activity search, one batched feedback and one status write
         Only applies to appointment types: APT-ENERG-CNT, APT-NISOL-CNT
         """
-        try:
-            # Check appointment type restriction
-            if not record.appointment_type_id:
-                return
-
-            if not record.appointment_type_id.x_appointment_ref:
-                return
-
-            if record.appointment_type_id.x_appointment_ref not in CALL_CENTER_APPOINTMENT_REFS:
-                return
+        # Prevent infinite recursion when processing NoShow activities
+        if self.env.context.get('processing_noshow_reschedule'):
+            return
 
-            # Prevent infinite recursion when processing NoShow activities
-            if self.env.context.get('processing_noshow_reschedule'):
-                return
+        # Check appointment type restriction
+        rescheduled_events = self.filtered(lambda e: e.x_automation_scope == 'call_center')
+        if not rescheduled_events:
+            return
 
-            # Only process if date/time fields changed (indicating reschedule)
-            if vals and not any(field in vals for field in ['start', 'stop', 'start_date', 'stop_date']):
+        try:
+            noshow_activity_type_id = self._get_noshow_activity_type_id()
+            if not noshow_activity_type_id:
                 return
 
-            # Find linked no-show activities
+            # Find linked no-show activities of all rescheduled events
             # Note: No need to filter by state - mail.activity table only contains active (not done) activities
             noshow_activities = self.env['mail.activity'].search([
                 ('res_model', '=', 'calendar.event'),
-                ('res_id', '=', record.id),
-                ('activity_type_id.name', '=', 'NoShow')
+                ('res_id', 'in', rescheduled_events.ids),
+                ('activity_type_id', '=', noshow_activity_type_id)
             ])
+            if not noshow_activities:
+                return
 
-            if noshow_activities:
-                _logger.info("Found %s NoShow activities for event ID %s - marking as done",
-                           len(noshow_activities), record.id)
-
-                # Set context flag to prevent recursion during activity processing
-                ctx = dict(self.env.context, processing_noshow_reschedule=True, skip_calendar_automation=True)
+            noshow_event_ids = set(noshow_activities.mapped('res_id'))
+            _logger.info("Found %s NoShow activities for event IDs %s - marking as done",
+                       len(noshow_activities), sorted(noshow_event_ids))
 
-                # Mark activities as done instead of deleting to avoid UI sync errors
-                # This prevents "Record does not exist" errors when the UI tries to refresh
-                current_user = self.env.user.name
-                feedback_message = f"❌ Annulée - NoShow plus applicable suite à la replanification du rendez-vous par {current_user}"
+            # Set context flag to prevent recursion during activity processing
+            ctx = dict(self.env.context, processing_noshow_reschedule=True, skip_calendar_automation=True)
 
-                for activity in noshow_activities:
-                    activity.with_context(ctx).action_feedback(feedback=feedback_message)
+            # Mark activities as done instead of deleting to avoid UI sync errors
+            # This prevents "Record does not exist" errors when the UI tries to refresh
+            current_user = self.env.user.name
+            feedback_message = f"❌ Annulée - NoShow plus applicable suite à la replanification du rendez-vous par {current_user}"
 
-                _logger.info("Marked %s NoShow activities as done for event ID %s",
-                           len(noshow_activities), record.id)
+            noshow_activities.with_context(ctx).action_feedback(feedback=feedback_message)
 
-                # Reset appointment status to 'booked' since the no_show is no longer relevant
-                if record.appointment_status == 'no_show':
-                    record.sudo().with_context(ctx).write({
-                        'appointment_status': 'booked'
-                    })
-                    _logger.info("Reset appointment status to 'booked' for event ID %s", record.id)
+            # Reset appointment status to 'booked' since the no_show is no longer relevant
+            events_to_reset = rescheduled_events.filtered(
+                lambda e: e.id in noshow_event_ids and e.appointment_status == 'no_show'
+            )
+            if events_to_reset:
+                events_to_reset.sudo().with_context(ctx).write({
+                    'appointment_status': 'booked'
+                })
+                _logger.info("Reset appointment status to 'booked' for event IDs %s", events_to_reset.ids)
 
         except Exception as e:
-            _logger.error("Update Calendar Status when Rescheduled - Error processing event ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            _logger.error("Update Calendar Status when Rescheduled - Error processing event IDs %s: %s",
+                        rescheduled_events.ids, str(e), exc_info=True)
 
-    def _update_clickable_from_attendee(self, record):
+    @automation_rule
+    def _update_clickable_from_attendee(self):
         """
         Update Clickable Address & Phone from Client Attendee - Automation Rule
         Syncs address and phone from client (non-internal) attendee to calendar event custom fields
         """
-        try:
-            # Find client attendees: partners not linked to internal users
-            client_partner = None
-            for attendee in record.attendee_ids:
-                partner = attendee.partner_id
-                if not partner:
-                    continue
-
-                # Check if partner is NOT an internal user
-                is_internal = any(
-                    user.has_group('base.group_user') for user in partner.user_ids if user.active
-                )
-
-                if not is_internal:
-                    client_partner = partner
-                    break  # Use the first client found
-
-            # Initialize values
-            new_address_html = False
-            new_phone_html = False
-
-            if client_partner:
-                _logger.info("Processing client partner: %s (ID: %s) for event ID %s",
-                           client_partner.name, client_partner.id, record.id)
-
-                # --- Build clickable address ---
-                addr_parts = []
-                if client_partner.street:
-                    addr_parts.append(client_partner.street)
-                if client_partner.street2:
-                    addr_parts.append(client_partner.street2)
-
-                city_zip = ' '.join(filter(None, [client_partner.zip, client_partner.city]))
-                if city_zip:
-                    addr_parts.append(city_zip)
-
-                if client_partner.country_id:
-                    addr_parts.append(client_partner.country_id.name)
-
-                if addr_parts:
-                    full_addr = ','.join(addr_parts)
-                    encoded_addr = full_addr.replace(' ', '+').replace(',', '%2C')
-                    maps_url = f"https://www.google.com/maps/search/?api=1&query={encoded_addr}"
-                    new_address_html = f'<a href="{maps_url}" target="_blank">{full_addr}</a>'
-
-                # --- Build clickable phone ---
-                phone = client_partner.phone
-                if phone:
-                    clean_phone = ''.join(c for c in phone if c.isdigit() or c == '+')
-                    if clean_phone:
-                        new_phone_html = f'<a href="tel:{clean_phone}">{phone}</a>'
-
-                # Prepare updates
-                update_vals = {}
-                if new_address_html != record.x_studio_customer_address:
-                    update_vals['x_studio_customer_address'] = new_address_html
-                    _logger.info("Updating customer address from attendee for event ID %s: %s",
-                               record.id, full_addr if addr_parts else 'cleared')
-
-                if new_phone_html != record.x_studio_customer_phone:
-                    update_vals['x_studio_customer_phone'] = new_phone_html
-                    _logger.info("Updating customer phone from attendee for event ID %s: %s",
-                               record.id, phone if phone else 'cleared')
-
-                # Apply updates in one write (only if needed)
-                if update_vals:
-                    record.sudo().with_context(skip_calendar_automation=True).write(update_vals)
-
-        except Exception as e:
-            _logger.error("Update Clickable Address & Phone from Attendee - Error processing event ID %s: %s",
-                        record.id, str(e), exc_info=True)
-
-    def _replace_call_center_emails(self, record):
+        for record in self:
+            try:
+                # Find client attendees: partners not linked to internal users
+                client_partner = None
+                for attendee in record.attendee_ids:
+                    partner = attendee.partner_id
+                    if not partner:
+                        continue
+
+                    # Check if partner is NOT an internal user
+                    if not partner.x_is_internal:
+                        client_partner = partner
+                        break  # Use the first client found
+
+                # Initialize values
+                new_address_html = False
+                new_phone_html = False
+
+                if client_partner:
+                    _logger.debug("Processing client partner: %s (ID: %s) for event ID %s",
+                               client_partner.name, client_partner.id, record.id)
+
+                    # --- Build clickable address ---
+                    addr_parts = []
+                    if client_partner.street:
+                        addr_parts.append(client_partner.street)
+                    if client_partner.street2:
+                        addr_parts.append(client_partner.street2)
+
+                    city_zip = ' '.join(filter(None, [client_partner.zip, client_partner.city]))
+                    if city_zip:
+                        addr_parts.append(city_zip)
+
+                    if client_partner.country_id:
+                        addr_parts.append(client_partner.country_id.name)
+
+                    if addr_parts:
+                        full_addr = ','.join(addr_parts)
+                        encoded_addr = full_addr.replace(' ', '+').replace(',', '%2C')
+                        maps_url = f"https://www.google.com/maps/search/?api=1&query={encoded_addr}"
+                        new_address_html = f'<a href="{maps_url}" target="_blank">{full_addr}</a>'
+
+                    # --- Build clickable phone ---
+                    phone = client_partner.phone
+                    if phone:
+                        clean_phone = ''.join(c for c in phone if c.isdigit() or c == '+')
+                        if clean_phone:
+                            new_phone_html = f'<a href="tel:{clean_phone}">{phone}</a>'
+
+                    # Prepare updates
+                    update_vals = {}
+                    if new_address_html != record.x_studio_customer_address:
+                        update_vals['x_studio_customer_address'] = new_address_html
+                        _logger.info("Updating customer address from attendee for event ID %s: %s",
+                                   record.id, full_addr if addr_parts else 'cleared')
+
+                    if new_phone_html != record.x_studio_customer_phone:
+                        update_vals['x_studio_customer_phone'] = new_phone_html
+                        _logger.info("Updating customer phone from attendee for event ID %s: %s",
+                                   record.id, phone if phone else 'cleared')
+
+                    # Apply updates in one write (only if needed)
+                    if update_vals:
+                        record.sudo().with_context(skip_calendar_automation=True).write(update_vals)
+
+            except Exception as e:
+                _logger.error("Update Clickable Address & Phone from Attendee - Error processing event ID %s: %s",
+                            record.id, str(e), exc_info=True)
+
+    @automation_rule
+    def _replace_call_center_emails(self):
         """
         Replace Call Center Emails - Automation Rule
         Replaces customer attendee emails that match internal user emails with standard call center email
         Prevents internal user emails from being exposed to customers
         Only applies to appointment types: APT-ENERG-CNT, APT-ENERG-COM, APT-NISOL-CNT, APT-NISOL-COM
         """
-        try:
-            # Check appointment type restriction
-            if not record.appointment_type_id:
-                return
-
-            if not record.appointment_type_id.x_appointment_ref:
-                return
-
-            if record.appointment_type_id.x_appointment_ref not in ALL_APPOINTMENT_REFS:
-                return
-
-            if not record.attendee_ids:
-                return
+        for record in self:
+            try:
+                # Check appointment type restriction
+                if record.x_automation_scope not in ALL_AUTOMATION_SCOPES:
+                    continue
 
-            standard_call_center_email = 'rdvcallbgg@gmail.com'
+                if not record.attendee_ids:
+                    continue
 
-            # Get all internal users (employees with portal/internal access)
-            internal_users = self.env['res.users'].search([
-                ('share', '=', False),  # Internal users (not portal users)
-                ('active', '=', True)
-            ])
+                standard_call_center_email = 'rdvcallbgg@gmail.com'
 
-            # Get all their emails (normalized to lowercase)
-            internal_user_emails = set()
-            for user in internal_users:
-                if user.email:
-                    internal_user_emails.add(user.email.strip().lower())
-                # Also check the partner email if different
-                if user.partner_id and user.partner_id.email:
-                    internal_user_emails.add(user.partner_id.email.strip().lower())
+                # Get all internal user emails (normalized to lowercase, cached per database)
+                internal_user_emails = self.env['res.users']._get_internal_emails()
 
-            _logger.info("Checking %s attendees against %s internal emails for event ID %s",
-                       len(record.attendee_ids), len(internal_user_emails), record.id)
+                if _logger.isEnabledFor(logging.DEBUG):
+                    _logger.debug("Checking %s attendees against %s internal emails for event ID %s",
+                                len(record.attendee_ids), len(internal_user_emails), record.id)
 
-            # Process each attendee
-            for attendee in record.attendee_ids:
-                partner = attendee.partner_id
+                # Process each attendee
+                for attendee in record.attendee_ids:
+                    partner = attendee.partner_id
 
-                if not partner or not partner.email:
-                    continue
+                    if not partner or not partner.email:
+                        continue
 
-                # Skip if this partner is an internal user themselves (the organizer)
-                is_internal_user = any(
-                    user.has_group('base.group_user') for user in partner.user_ids if user.active
-                )
-                if is_internal_user:
-                    continue
+                    # Skip if this partner is an internal user themselves (the organizer)
+                    if partner.x_is_internal:
+                        continue
 
-                # This is a CUSTOMER attendee - check their email
-                customer_email = partner.email.strip().lower()
+                    # This is a CUSTOMER attendee - check their email
+                    customer_email = partner.email.strip().lower()
 
-                # Skip if already the standard call center email
-                if customer_email == standard_call_center_email.lower():
-                    continue
+                    # Skip if already the standard call center email
+                    if customer_email == standard_call_center_email.lower():
+                        continue
 
-                # Check if customer email matches any internal user email
-                if customer_email in internal_user_emails:
-                    # This is an internal user email, replace it
-                    original_email = partner.email
-                    _logger.info("Internal user email detected in CUSTOMER: %s (ID: %s) - Email: %s - Replacing with %s",
-                                partner.name, partner.id, original_email, standard_call_center_email)
+                    # Check if customer email matches any internal user email
+                    if customer_email in internal_user_emails:
+                        # This is an internal user email, replace it
+                        original_email = partner.email
+                        _logger.info("Internal user email detected in CUSTOMER: %s (ID: %s) - Email: %s - Replacing with %s",
+                                    partner.name, partner.id, original_email, standard_call_center_email)
 
-                    partner.with_context(
-                        mail_create_nosubscribe=True,
-                        tracking_disable=True
-                    ).write({'email': standard_call_center_email})
+                        partner.with_context(
+                            mail_create_nosubscribe=True,
+                            tracking_disable=True
+                        ).write({'email': standard_call_center_email})
 
-                    _logger.info("Replaced internal email '%s' with '%s' for CUSTOMER: %s",
-                               original_email, standard_call_center_email, partner.name)
+                        _logger.info("Replaced internal email '%s' with '%s' for CUSTOMER: %s",
+                                   original_email, standard_call_center_email, partner.name)
 
-        except Exception as e:
-            _logger.error("Replace Call Center Emails - Error processing event ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            except Exception as e:
+                _logger.error("Replace Call Center Emails - Error processing event ID %s: %s",
+                            record.id, str(e), exc_info=True)
 
-    def _assign_existing_customer(self, record):
+    @automation_rule
+    def _assign_existing_customer(self):
         """
         Assign Existing Customer To Calendar Event and Opportunity - Automation Rule
         Finds existing customers by phone (last 8 digits), assigns them to event and opportunity
-        Cleans up duplicate customer records when safe to do so
+        Marks unused duplicate customer records for deferred deletion (see _cron_collect_duplicate_partners)
         Only applies to appointment types: APT-ENERG-CNT, APT-ENERG-COM, APT-NISOL-CNT, APT-NISOL-COM
         """
-        try:
-            # Check appointment type restriction
-            if not record.appointment_type_id:
-                return
-
-            if not record.appointment_type_id.x_appointment_ref:
-                return
+        for record in self:
+            try:
+                # Check appointment type restriction
+                if record.x_automation_scope not in ALL_AUTOMATION_SCOPES:
+                    continue
 
-            if record.appointment_type_id.x_appointment_ref not in ALL_APPOINTMENT_REFS:
-                return
+                phone = None
+
+                # Try to get phone from custom field
+                try:
+                    if record.x_studio_customer_phone:
+                        phone_text = record.x_studio_customer_phone
+                        if 'tel:' in phone_text:
+                            start = phone_text.find('tel:') + 4
+                            end = phone_text.find('"', start)
+                            if end == -1:
+                                end = phone_text.find('>', start)
+                            if end > start:
+                                phone = phone_text[start:end]
+                            else:
+                                phone = phone_text[start:].strip()
+                        else:
+                            phone = phone_text
+                except:
+                    pass
 
-            phone = None
+                # Fallback to partner phone
+                if not phone and record.partner_id:
+                    if record.partner_id.phone:
+                        phone = record.partner_id.phone
 
-            # Try to get phone from custom field
-            try:
-                if record.x_studio_customer_phone:
-                    phone_text = record.x_studio_customer_phone
-                    if 'tel:' in phone_text:
-                        start = phone_text.find('tel:') + 4
-                        end = phone_text.find('"', start)
-                        if end == -1:
-                            end = phone_text.find('>', start)
-                        if end > start:
-                            phone = phone_text[start:end]
-                        else:
-                            phone = phone_text[start:].strip()
-                    else:
-                        phone = phone_text
-            except:
-                pass
-
-            # Fallback to partner phone
-            if not phone and record.partner_id:
-                if record.partner_id.phone:
-                    phone = record.partner_id.phone
-
-            if phone:
-                # Clean phone - keep only digits
-                clean_phone = ''.join(c for c in phone if c.isdigit())
-
-                if len(clean_phone) >= 8:
-                    last_8_digits = clean_phone[-8:]
-                    _logger.info("Searching for existing customer with last 8 digits: %s for event ID %s",
-                               last_8_digits, record.id)
-
-                    # Search for existing customers
-                    existing_customers = self.env['res.partner'].search([
-                        ('phone', 'ilike', last_8_digits)
-                    ])
-
-                    # Filter out internal users
-                    real_customers = existing_customers.filtered(
-                        lambda p: not any(user.has_group('base.group_user') for user in p.user_ids if user.active)
-                    )
-
-                    if real_customers:
-                        # Sort by creation date - oldest first (most likely the real customer)
-                        real_customers = real_customers.sorted(key=lambda p: p.create_date)
-                        customer = real_customers[0]
-
-                        _logger.info("Found existing customer: %s (ID: %s) for event ID %s",
-                                   customer.name, customer.id, record.id)
-
-                        # Find potential duplicates to clean up
-                        potential_duplicates = real_customers.filtered(lambda p: p.id != customer.id)
-
-                        # Also check current attendees for duplicates
-                        attendee_partners = [att.partner_id for att in record.attendee_ids if att.partner_id]
-
-                        for attendee_partner in attendee_partners:
-                            # If this attendee is not the main customer and has similar phone
-                            if attendee_partner.id != customer.id:
-                                # Check if it's a duplicate (same last 8 digits)
-                                if attendee_partner.phone:
-                                    attendee_phone = attendee_partner.phone
-                                    attendee_clean = ''.join(c for c in attendee_phone if c.isdigit())
-                                    if len(attendee_clean) >= 8 and attendee_clean[-8:] == last_8_digits:
+                if phone:
+                    # Clean phone - keep only digits
+                    clean_phone = ''.join(c for c in phone if c.isdigit())
+
+                    if len(clean_phone) >= PHONE_SUFFIX_LENGTH:
+                        last_8_digits = clean_phone[-PHONE_SUFFIX_LENGTH:]
+                        _logger.debug("Searching for existing customer with last 8 digits: %s for event ID %s",
+                                   last_8_digits, record.id)
+
+                        # Search for existing customers (indexed equality on the normalized phone keys),
+                        # filtering out internal users, oldest first (most likely the real customer)
+                        customer_domain = [
+                            ('x_phone_suffix', '=', last_8_digits),
+                            ('x_is_internal', '=', False),
+                        ]
+                        # When the number is international, customers whose full number is known
+                        # and different (e.g. another country) only share the last 8 digits
+                        e164 = phone_keys(phone)[0]
+                        if e164:
+                            customer_domain.append(('x_phone_e164', 'in', [e164, False]))
+                        real_customers = self.env['res.partner'].search(customer_domain, order='create_date, id')
+
+                        if real_customers:
+                            customer = real_customers[0]
+
+                            _logger.debug("Found existing customer: %s (ID: %s) for event ID %s",
+                                       customer.name, customer.id, record.id)
+
+                            # Find potential duplicates to clean up
+                            potential_duplicates = real_customers.filtered(lambda p: p.id != customer.id)
+
+                            # Also check current attendees for duplicates
+                            attendee_partners = [att.partner_id for att in record.attendee_ids if att.partner_id]
+
+                            for attendee_partner in attendee_partners:
+                                # If this attendee is not the main customer and has similar phone
+                                if attendee_partner.id != customer.id:
+                                    # Check if it's a duplicate (same last 8 digits)
+                                    if attendee_partner.x_phone_suffix == last_8_digits:
                                         if attendee_partner not in potential_duplicates:
                                             potential_duplicates |= attendee_partner
 
-                        # Check if customer is already an attendee
-                        customer_already_attendee = any(
-                            attendee.partner_id.id == customer.id
-                            for attendee in record.attendee_ids
-                        )
-
-                        # Add customer as attendee if not already
-                        if not customer_already_attendee:
-                            record.with_context(skip_calendar_automation=True).write({'partner_ids': [(4, customer.id)]})
-                            _logger.info("Added %s as attendee to event ID %s", customer.name, record.id)
-
-                        # Update opportunity if exists
-                        try:
-                            if record.opportunity_id:
-                                if record.opportunity_id.partner_id.id != customer.id:
-                                    record.opportunity_id.write({'partner_id': customer.id})
-                                    _logger.info("Updated opportunity partner to: %s for event ID %s",
-                                               customer.name, record.id)
-                        except:
-                            pass
-
-                        # Search for related opportunities
-                        opportunities = self.env['crm.lead'].search([('calendar_event_ids', 'in', record.id)])
-                        for opp in opportunities:
-                            if opp.partner_id.id != customer.id:
-                                opp.write({'partner_id': customer.id})
-                                _logger.info("Updated opportunity '%s' to customer: %s", opp.name, customer.name)
-
-                        # Clean up duplicates
-                        for duplicate in potential_duplicates:
-                            _logger.info("Found potential duplicate: %s (ID: %s) for event ID %s",
-                                       duplicate.name, duplicate.id, record.id)
-
-                            # Remove from attendees if present
-                            duplicate_attendee = record.attendee_ids.filtered(lambda a: a.partner_id.id == duplicate.id)
-                            if duplicate_attendee:
-                                record.with_context(skip_calendar_automation=True).write({'partner_ids': [(3, duplicate.id)]})
-                                _logger.info("Removed duplicate %s from attendees", duplicate.name)
-
-                            # Check if safe to delete
-                            other_events = self.env['calendar.event'].search([
-                                ('partner_id', '=', duplicate.id),
-                                ('id', '!=', record.id)
-                            ])
-
-                            # Check attendees in other events
-                            other_event_attendees = self.env['calendar.attendee'].search([
-                                ('partner_id', '=', duplicate.id),
-                                ('event_id', '!=', record.id)
-                            ])
-
-                            other_opps = self.env['crm.lead'].search([('partner_id', '=', duplicate.id)])
-
-                            # Only delete if not used elsewhere
-                            if not other_events and not other_event_attendees and not other_opps:
-                                try:
-                                    duplicate_name = duplicate.name
-                                    duplicate_id = duplicate.id
-                                    duplicate.unlink()
-                                    _logger.info("Deleted duplicate partner: %s (ID: %s)", duplicate_name, duplicate_id)
-                                except Exception as delete_error:
-                                    _logger.warning("Could not delete duplicate %s (ID: %s): %s",
-                                                  duplicate.name, duplicate.id, str(delete_error))
-                            else:
-                                _logger.info("Duplicate %s is used elsewhere, keeping it", duplicate.name)
-
-                        _logger.info("Successfully assigned existing customer: %s to event ID %s",
-                                   customer.name, record.id)
+                            # Check if customer is already an attendee
+                            customer_already_attendee = any(
+                                attendee.partner_id.id == customer.id
+                                for attendee in record.attendee_ids
+                            )
+
+                            # Add customer as attendee if not already
+                            if not customer_already_attendee:
+                                record.with_context(skip_calendar_automation=True).write({'partner_ids': [(4, customer.id)]})
+                                _logger.info("Added %s as attendee to event ID %s", customer.name, record.id)
+
+                            # Update opportunity if exists
+                            try:
+                                if record.opportunity_id:
+                                    if record.opportunity_id.partner_id.id != customer.id:
+                                        record.opportunity_id.write({'partner_id': customer.id})
+                                        _logger.info("Updated opportunity partner to: %s for event ID %s",
+                                                   customer.name, record.id)
+                            except:
+                                pass
+
+                            # Search for related opportunities
+                            opportunities = self.env['crm.lead'].search([('calendar_event_ids', 'in', record.id)])
+                            for opp in opportunities:
+                                if opp.partner_id.id != customer.id:
+                                    opp.write({'partner_id': customer.id})
+                                    _logger.info("Updated opportunity '%s' to customer: %s", opp.name, customer.name)
+
+                            # Clean up duplicates
+                            if potential_duplicates:
+                                _logger.debug("Found potential duplicates: %s for event ID %s",
+                                           potential_duplicates.ids, record.id)
+
+                                # Remove from attendees if present
+                                duplicate_attendees = potential_duplicates & record.attendee_ids.partner_id
+                                if duplicate_attendees:
+                                    record.with_context(skip_calendar_automation=True).write({
+                                        'partner_ids': [(3, duplicate.id) for duplicate in duplicate_attendees]
+                                    })
+                                    _logger.info("Removed duplicates %s from attendees", duplicate_attendees.ids)
+
+                                # Check if safe to delete: references from other events, attendees of
+                                # other events and opportunities, for all duplicates at once
+                                referenced_ids = potential_duplicates._get_referenced_partner_ids(
+                                    exclude_event_ids=record.ids)
+
+                                # Only mark duplicates that are not used elsewhere: they are deleted
+                                # later by the duplicate partner collection cron, not in this request
+                                unused_duplicates = potential_duplicates.filtered(lambda p: p.id not in referenced_ids)
+                                if unused_duplicates:
+                                    unused_duplicates._mark_as_duplicate_of(customer)
+                                    _logger.info("Marked duplicate partners %s of customer ID %s for collection",
+                                               unused_duplicates.ids, customer.id)
+
+                                used_duplicates = potential_duplicates - unused_duplicates
+                                if used_duplicates:
+                                    _logger.debug("Duplicates %s are used elsewhere, keeping them", used_duplicates.ids)
+
+                            _logger.info("Successfully assigned existing customer: %s to event ID %s",
+                                       customer.name, record.id)
+                        else:
+                            _logger.debug("No existing customer found for phone digits: %s", last_8_digits)
                     else:
-                        _logger.info("No existing customer found for phone digits: %s", last_8_digits)
+                        _logger.warning("Phone number too short (< 8 digits): %s for event ID %s",
+                                      clean_phone, record.id)
                 else:
-                    _logger.warning("Phone number too short (< 8 digits): %s for event ID %s",
-                                  clean_phone, record.id)
-            else:
-                _logger.info("No phone number found for event ID %s", record.id)
+                    _logger.debug("No phone number found for event ID %s", record.id)
 
-        except Exception as e:
-            _logger.error("Assign Existing Customer - Error processing event ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            except Exception as e:
+                _logger.error("Assign Existing Customer - Error processing event ID %s: %s",
+                            record.id, str(e), exc_info=True)
 
-    def _create_activity_noshow(self, record):
+    @automation_rule
+    def _create_activity_noshow(self):
         """
         Create activity for NoShow - Automation Rule
-        Creates or updates a NoShow activity when appointment status is set to no_show
+        Creates or updates a NoShow activity when appointment status changes to no_show
+        Called with the events that just entered the no_show status (see create/write)
         Only applies to appointment types: APT-ENERG-CNT, APT-NISOL-CNT
         """
-        try:
-            # Check appointment type restriction
-            if not record.appointment_type_id:
-                return
-
-            if not record.appointment_type_id.x_appointment_ref:
-                return
-
-            if record.appointment_type_id.x_appointment_ref not in CALL_CENTER_APPOINTMENT_REFS:
-                return
-
-            if record.appointment_status != 'no_show':
-                return
-
-            _logger.info("Processing NoShow status for calendar event ID %s", record.id)
-
-            noshow_activity_type = self.env['mail.activity.type'].search([('name', '=', 'NoShow')], limit=1)
-
-            if not noshow_activity_type:
-                _logger.warning("NoShow activity type not found in system for event ID %s", record.id)
-                return
+        noshow_events = self.filtered(
+            lambda e: e.x_automation_scope == 'call_center' and e.appointment_status == 'no_show'
+        )
+        if not noshow_events:
+            return
+
+        noshow_activity_type_id = self._get_noshow_activity_type_id()
+        if not noshow_activity_type_id:
+            _logger.warning("NoShow activity type not found in system for event IDs %s", noshow_events.ids)
+            return
+
+        res_model_id = self.env['ir.model']._get_id('calendar.event')
+
+        # Existing NoShow activities of all events, in one search
+        existing_activities = self.env['mail.activity'].search([
+            ('res_model', '=', 'calendar.event'),
+            ('res_id', 'in', noshow_events.ids),
+            ('activity_type_id', '=', noshow_activity_type_id)
+        ]).grouped('res_id')
+
+        for record in noshow_events:
+            try:
+                _logger.debug("Processing NoShow status for calendar event ID %s", record.id)
 
-            existing_activity = self.env['mail.activity'].search([
-                ('res_model', '=', 'calendar.event'),
-                ('res_id', '=', record.id),
-                ('activity_type_id', '=', noshow_activity_type.id)
-            ], limit=1)
+                # Get the event organizer, ensuring we don't assign to public user
+                user = self.env.user
+                assigned_user = False
 
-            # Get the event organizer, ensuring we don't assign to public user
-            user = self.env.user
-            assigned_user = False
+                if record.user_id:
+                    assigned_user = record.user_id
+                elif not user._is_public():
+                    assigned_user = user
 
-            if record.user_id:
-                assigned_user = record.user_id
-            elif not user._is_public():
-                assigned_user = user
+                if not assigned_user:
+                    _logger.warning("No valid user to assign NoShow activity for event ID %s", record.id)
+                    continue
 
-            if assigned_user:
                 activity_values = {
-                    'activity_type_id': noshow_activity_type.id,
                     'user_id': assigned_user.id,
-                    'res_model_id': self.env['ir.model']._get('calendar.event').id,
-                    'res_id': record.id,
-                    'calendar_event_id': record.id,
                     'date_deadline': datetime.datetime.now().date(),
                     'summary': f'NoShow: {record.name or "Rendez-vous (Etude)"}',
                 }
 
+                existing_activity = existing_activities.get(record.id, self.env['mail.activity'])[:1]
                 if existing_activity:
-                    existing_activity.write(activity_values)
-                    _logger.info("Updated existing NoShow activity (ID %s) for event ID %s",
-                               existing_activity.id, record.id)
+                    # Only write the values that actually changed
+                    changed_values = {
+                        field_name: value
+                        for field_name, value in activity_values.items()
+                        if existing_activity._fields[field_name].convert_to_write(
+                            existing_activity[field_name], existing_activity) != value
+                    }
+                    if changed_values:
+                        existing_activity.write(changed_values)
+                        _logger.info("Updated existing NoShow activity (ID %s) for event ID %s: %s",
+                                   existing_activity.id, record.id, list(changed_values))
+                    else:
+                        _logger.debug("NoShow activity (ID %s) already up to date for event ID %s",
+                                   existing_activity.id, record.id)
                 else:
-                    new_activity = self.env['mail.activity'].create(activity_values)
+                    new_activity = self.env['mail.activity'].create(dict(
+                        activity_values,
+                        activity_type_id=noshow_activity_type_id,
+                        res_model_id=res_model_id,
+                        res_id=record.id,
+                        calendar_event_id=record.id,
+                    ))
                     _logger.info("Created new NoShow activity (ID %s) for event ID %s, assigned to user %s",
                                new_activity.id, record.id, assigned_user.name)
-            else:
-                _logger.warning("No valid user to assign NoShow activity for event ID %s", record.id)
 
-        except Exception as e:
-            _logger.error("Create Activity for NoShow - Error processing event ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            except Exception as e:
+                _logger.error("Create Activity for NoShow - Error processing event ID %s: %s",
+                            record.id, str(e), exc_info=True)
+
+    @api.model
+    @tools.ormcache()
+    def _get_noshow_activity_type_id(self):
+        """
+        Return the ID of the NoShow activity type (cached, invalidated when activity types change)
+        The name is searched in en_US, which always holds a value (the one typed at creation),
+        so that the cached ID does not depend on the language of the user who filled the cache
+        """
+        noshow_activity_type = self.env['mail.activity.type'].sudo().with_context(lang='en_US').search([
+            ('name', '=', 'NoShow'),
+        ], limit=1)
+        return noshow_activity_type.id
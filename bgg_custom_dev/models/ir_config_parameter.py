@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models
+
+from .calendar_event import COMMERCIAL_GROUP_XMLID_PARAM
+
+
+class IrConfigParameter(models.Model):
+    _inherit = 'ir.config_parameter'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to recompute the commercial of the events when the Commercial group is set"""
+        records = super(IrConfigParameter, self).create(vals_list)
+        if any(vals.get('key') == COMMERCIAL_GROUP_XMLID_PARAM for vals in vals_list):
+            self.env['calendar.event']._recompute_commercial()
+        return records
+
+    def write(self, vals):
+        """Override write to recompute the commercial of the events when the Commercial group changes"""
+        changes_group = (COMMERCIAL_GROUP_XMLID_PARAM in self.mapped('key')
+                         or vals.get('key') == COMMERCIAL_GROUP_XMLID_PARAM)
+        result = super(IrConfigParameter, self).write(vals)
+        if changes_group:
+            self.env['calendar.event']._recompute_commercial()
+        return result
+
+    def unlink(self):
+        """Override unlink to clear the commercial of the events when the Commercial group is removed"""
+        changes_group = COMMERCIAL_GROUP_XMLID_PARAM in self.mapped('key')
+        result = super(IrConfigParameter, self).unlink()
+        if changes_group:
+            self.env['calendar.event']._recompute_commercial()
+        return result
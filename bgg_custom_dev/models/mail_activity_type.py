@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models
+
+
+class MailActivityType(models.Model):
+    _inherit = 'mail.activity.type'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to invalidate the cached NoShow activity type"""
+        records = super(MailActivityType, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        """Override write to invalidate the cached NoShow activity type when an activity type is renamed"""
+        result = super(MailActivityType, self).write(vals)
+        if 'name' in vals or 'active' in vals:
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        """Override unlink to invalidate the cached NoShow activity type"""
+        result = super(MailActivityType, self).unlink()
+        self.env.registry.clear_cache()
+        return result
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import logging
+from collections import defaultdict
+
 from odoo import api, models
 
+from ..tools import automation_rule, filter_new_records, mark_new_records
+
 _logger = logging.getLogger(__name__)
 
 
@@ -13,9 +17,9 @@ class ProjectProject(models.Model):
     def create(self, vals_list):
         """Override create to trigger automation rules on new projects"""
         records = super(ProjectProject, self).create(vals_list)
+        mark_new_records(records)
 
-        for record in records:
-            self._update_project_folder_name(record)
+        records._update_project_folder_name()
 
         return records
 
@@ -25,67 +29,52 @@ class ProjectProject(models.Model):
 
         # If a documents folder is being added to the project, try to rename it
         if 'documents_folder_id' in vals and vals['documents_folder_id']:
-            _logger.info("[FOLDER RENAME] documents_folder_id added via write(), triggering rename")
-            for record in self:
-                # Force the rename since this might be adding the folder after creation
-                self._update_project_folder_name(record, force=True)
+            _logger.debug("[FOLDER RENAME] documents_folder_id added via write(), triggering rename")
+            # Force the rename since this might be adding the folder after creation
+            self._update_project_folder_name(force=True)
 
         return result
 
-    def _update_project_folder_name(self, record, force=False):
+    @automation_rule
+    def _update_project_folder_name(self, force=False):
         """
         Update Project Folder Name - Automation Rule
-        Renames the project's documents folder based on sales order and customer name
+        Renames the projects' documents folders based on sales order and customer name
         Format: SO Name - Projet - Customer Name
+        Names are computed for the whole recordset (sales orders and customers are prefetched),
+        then the folders are renamed with one write per distinct name
 
         Args:
-            record: project.project record
-            force: if True, skip the timestamp check (useful for manual triggers)
+            force: if True, also process projects not created in this transaction (useful for manual triggers)
         """
         try:
-            _logger.info("[FOLDER RENAME] Checking project (ID %s): %s", record.id, record.name)
-            _logger.info("[FOLDER RENAME]   create_date: %s, write_date: %s",
-                        record.create_date, record.write_date)
-
-            # Only process if this is a new record (newly created project from template)
+            # Only process projects created in this transaction (newly created projects from template)
             # Skip this check if force=True (for manual triggers)
-            if not force and not (record.create_date == record.write_date):
-                _logger.info("[FOLDER RENAME]   Skipping - not a new record (create_date != write_date)")
-                return
-
-            # Check if project has an associated sale order line
-            if not record.sale_line_id:
-                _logger.info("[FOLDER RENAME]   Skipping - no sale_line_id")
-                return
-
-            # Get the sales order and client information
-            sale_order = record.sale_line_id.order_id
-            customer = sale_order.partner_id
-
-            _logger.info("[FOLDER RENAME]   Sale Order: %s, Customer: %s",
-                        sale_order.name, customer.name)
+            projects = self if force else filter_new_records(self)
 
-            # Check if we have a documents folder created
-            if not record.documents_folder_id:
-                _logger.warning("[FOLDER RENAME]   No documents folder found for project ID %s", record.id)
+            # Only projects with an associated sale order line
+            projects = projects.filtered('sale_line_id')
+            if not projects:
                 return
 
-            # Create new folder name with SO reference and client name
-            new_folder_name = f"{sale_order.name} - Projet - {customer.name}"
-            current_folder_name = record.documents_folder_id.name
+            without_folder = projects.filtered(lambda p: not p.documents_folder_id)
+            if without_folder:
+                _logger.warning("[FOLDER RENAME] No documents folder found for project IDs %s", without_folder.ids)
 
-            _logger.info("[FOLDER RENAME]   Current folder: '%s'", current_folder_name)
-            _logger.info("[FOLDER RENAME]   Target folder: '%s'", new_folder_name)
+            # Folders to rename, grouped by their new name
+            Folder = self.env[self._fields['documents_folder_id'].comodel_name]
+            folders_by_name = defaultdict(Folder.browse)
+            for project in projects - without_folder:
+                sale_order = project.sale_line_id.order_id
+                new_folder_name = f"{sale_order.name} - Projet - {sale_order.partner_id.name}"
+                if project.documents_folder_id.name != new_folder_name:
+                    folders_by_name[new_folder_name] |= project.documents_folder_id
 
-            if current_folder_name != new_folder_name:
-                record.documents_folder_id.write({
-                    'name': new_folder_name
-                })
-                _logger.info("[FOLDER RENAME]   ✓ Updated folder name to: '%s' for project ID %s",
-                           new_folder_name, record.id)
-            else:
-                _logger.info("[FOLDER RENAME]   Folder name already correct for project ID %s", record.id)
+            for new_folder_name, folders in folders_by_name.items():
+                folders.write({'name': new_folder_name})
+                _logger.info("[FOLDER RENAME] ✓ Updated folder name to: '%s' for folder IDs %s",
+                           new_folder_name, folders.ids)
 
         except Exception as e:
-            _logger.error("[FOLDER RENAME] Error processing project ID %s: %s",
-                        record.id, str(e), exc_info=True)
+            _logger.error("[FOLDER RENAME] Error processing project IDs %s: %s",
+                        self.ids, str(e), exc_info=True)
@@ -2,76 +2,121 @@
 
 import datetime
 import logging
-from odoo import api, models
+from odoo import api, fields, models
+from odoo.tools.sql import column_exists, create_column
+
+from ..tools import automation_rule
 
 _logger = logging.getLogger(__name__)
 
+# Name of the welcome call tasks of the project templates (spelling as used in the templates)
+WELCOME_CALL_TASK_NAME = "Welcom call"
+
+# Welcome calls are due this long after the sales order date
+WELCOME_CALL_DELAY = datetime.timedelta(days=2)
+
 
 class ProjectTask(models.Model):
     _inherit = 'project.task'
 
+    # Marks the welcome call tasks; copied from the template task, so that renamed templates still match
+    x_is_welcome_call = fields.Boolean(
+        string='Welcome Call',
+        index=True,
+        copy=True,
+        help='The deadline of this task is set to 2 days after the sales order date'
+    )
+
+    def _auto_init(self):
+        # Create the marker column up front and mark the existing welcome call tasks by name
+        if not column_exists(self.env.cr, self._table, 'x_is_welcome_call'):
+            create_column(self.env.cr, self._table, 'x_is_welcome_call', 'bool')
+            self.env.cr.execute(
+                "UPDATE project_task SET x_is_welcome_call = TRUE WHERE name = %s",
+                [WELCOME_CALL_TASK_NAME],
+            )
+        return super(ProjectTask, self)._auto_init()
+
     @api.model_create_multi
     def create(self, vals_list):
-        """Override create to trigger automation rules on new tasks"""
-        records = super(ProjectTask, self).create(vals_list)
-
-        for record in records:
-            self._set_welcome_call_deadline(record)
+        """Override create to set the welcome call deadline in the values of new tasks"""
+        self._set_welcome_call_deadline(vals_list)
 
-        return records
+        return super(ProjectTask, self).create(vals_list)
 
-    def _set_welcome_call_deadline(self, record):
+    @automation_rule
+    def _set_welcome_call_deadline(self, vals_list):
         """
         Set Welcome Call Deadline - Automation Rule
-        Sets the deadline for "Welcom call" tasks to 2 days after the sales order date
+        Sets the deadline for welcome call tasks to 2 days after the sales order date
+        Welcome call tasks carry the x_is_welcome_call marker (copied from the template task),
+        or are named "Welcom call"; the marker is set on the latter
+        Works on the create values, so that tasks are inserted with their deadline
+
+        Args:
+            vals_list: create values of the new tasks, updated in place
+        """
+        welcome_vals_list = []
+        for vals in vals_list:
+            if vals.get('x_is_welcome_call') or vals.get('name') == WELCOME_CALL_TASK_NAME:
+                vals['x_is_welcome_call'] = True
+                welcome_vals_list.append(vals)
+        if not welcome_vals_list:
+            return
+
+        default_project_id = self.env.context.get('default_project_id')
+        order_by_project, order_by_sale_line = self._get_welcome_call_sale_orders(
+            {vals.get('project_id') or default_project_id for vals in welcome_vals_list} - {None, False},
+            {vals.get('sale_line_id') for vals in welcome_vals_list} - {None, False},
+        )
+
+        for vals in welcome_vals_list:
+            try:
+                project_id = vals.get('project_id') or default_project_id
+
+                # Sales order of the project first, then the one of the task's sales order line
+                sale_order = order_by_project.get(project_id) or order_by_sale_line.get(vals.get('sale_line_id'))
+
+                if not sale_order:
+                    _logger.warning("No sales order linked to new Welcome call task in project ID %s", project_id)
+                    continue
+
+                order_date = sale_order.date_order
+                if not order_date:
+                    _logger.warning("Sales order %s has no date_order for new Welcome call task", sale_order.name)
+                    continue
+
+                # Set the deadline to two days after the sales order date
+                deadline_date = order_date + WELCOME_CALL_DELAY
+                vals['date_deadline'] = deadline_date
+
+                _logger.info("Welcome call deadline set to %s (2 days after order date %s) for new task in project ID %s",
+                           deadline_date, order_date, project_id)
+
+            except Exception as e:
+                _logger.error("Set Welcome Call Deadline - Error processing new task values: %s",
+                            str(e), exc_info=True)
+
+    @api.model
+    def _get_welcome_call_sale_orders(self, project_ids, sale_line_ids):
+        """
+        Resolve the sales orders of projects and sales order lines, with one read per model
+
+        Returns:
+            tuple: ({project_id: sale.order}, {sale_line_id: sale.order}), without the ones without order
         """
-        try:
-            # Only process if this is a new record (newly created task from template)
-            if not (record.create_date == record.write_date):
-                return
-
-            # Check if task name is "Welcom call" (using the exact spelling from the requirement)
-            if record.name == "Welcom call":
-                _logger.info("Processing Welcome call task (ID %s) for project %s",
-                           record.id, record.project_id.name if record.project_id else 'N/A')
-
-                # Try to get the sales order from multiple sources
-                sale_order = None
-
-                # First try: direct field project_sale_order_id
-                if hasattr(record, 'project_sale_order_id') and record.project_sale_order_id:
-                    sale_order = record.project_sale_order_id
-                # Second try: through sale_line_id (standard Odoo sale_project field)
-                elif hasattr(record, 'sale_line_id') and record.sale_line_id:
-                    sale_order = record.sale_line_id.order_id
-                # Third try: through project's sale_order_id or sale_line_id
-                elif record.project_id:
-                    if hasattr(record.project_id, 'sale_order_id') and record.project_id.sale_order_id:
-                        sale_order = record.project_id.sale_order_id
-                    elif hasattr(record.project_id, 'sale_line_id') and record.project_id.sale_line_id:
-                        sale_order = record.project_id.sale_line_id.order_id
-
-                if sale_order and hasattr(sale_order, 'date_order'):
-                    order_date = sale_order.date_order
-
-                    if order_date:
-                        # Calculate deadline date (2 days after order date)
-                        deadline_date = order_date + datetime.timedelta(days=2)
-
-                        # Set the deadline to two days after the sales order date
-                        record.write({
-                            'date_deadline': deadline_date
-                        })
-
-                        # Log the action for tracking
-                        project_name = record.project_id.name if record.project_id else 'N/A'
-                        _logger.info("Welcome call deadline set to %s (2 days after order date %s) for task ID %s in project %s",
-                                   deadline_date, order_date, record.id, project_name)
-                    else:
-                        _logger.warning("Sales order has no date_order for Welcome call task ID %s", record.id)
-                else:
-                    _logger.warning("No sales order linked to Welcome call task ID %s", record.id)
-
-        except Exception as e:
-            _logger.error("Set Welcome Call Deadline - Error processing task ID %s: %s",
-                        record.id, str(e), exc_info=True)
+        projects = self.env['project.project'].sudo().search_fetch(
+            [('id', 'in', list(project_ids))], ['sale_order_id', 'sale_line_id'])
+        sale_lines = self.env['sale.order.line'].sudo().search_fetch(
+            [('id', 'in', list(sale_line_ids))], ['order_id'])
+
+        order_by_project = {
+            project.id: project.sale_order_id or project.sale_line_id.order_id
+            for project in projects
+            if project.sale_order_id or project.sale_line_id
+        }
+        order_by_sale_line = {line.id: line.order_id for line in sale_lines}
+
+        orders = self.env['sale.order'].sudo().union(*order_by_project.values(), *order_by_sale_line.values())
+        orders.fetch(['name', 'date_order'])
+        return order_by_project, order_by_sale_line
@@ -0,0 +1,472 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+import logging
+from collections import defaultdict
+from odoo import api, fields, models
+from odoo.tools.sql import column_exists, create_column
+
+_logger = logging.getLogger(__name__)
+
+# Number of trailing phone digits used to match customers
+PHONE_SUFFIX_LENGTH = 8
+
+# Last phone suffix processed by the phone bucket deduplication, to resume interrupted runs
+DEDUP_CURSOR_PARAM = 'bgg_custom_dev.phone_dedup_cursor'
+
+
+def phone_digits(phone):
+    """Return only the digits of a phone number"""
+    return ''.join(c for c in phone or '' if c.isdigit())
+
+
+def phone_keys(phone, country_phone_code=None):
+    """
+    Return the normalized matching keys of a phone number
+
+    Args:
+        phone: phone number as typed by the user
+        country_phone_code: calling code used to expand national numbers (e.g. 32)
+
+    Returns:
+        tuple: (e164, suffix) where e164 is the full +<country code><number> form (False when it
+               cannot be determined) and suffix the last 8 digits (False when the number is too short)
+    """
+    digits = phone_digits(phone)
+    if len(digits) < PHONE_SUFFIX_LENGTH:
+        return False, False
+
+    if phone.strip().startswith('+'):
+        e164 = '+' + digits
+    elif digits.startswith('00'):
+        e164 = '+' + digits[2:]
+    elif digits.startswith('0') and country_phone_code:
+        e164 = '+%s%s' % (country_phone_code, digits[1:])
+    else:
+        e164 = False
+
+    return e164, digits[-PHONE_SUFFIX_LENGTH:]
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    # Normalized phone keys used for customer matching (btree indexed equality lookups)
+    x_phone_e164 = fields.Char(
+        string='Phone (E.164)',
+        compute='_compute_phone_keys',
+        store=True,
+        index=True,
+        readonly=True,
+        help='Phone number in international form, used for customer matching'
+    )
+
+    x_phone_suffix = fields.Char(
+        string='Phone Suffix',
+        compute='_compute_phone_keys',
+        store=True,
+        index=True,
+        readonly=True,
+        help='Last 8 digits of the phone number, used for customer matching'
+    )
+
+    # Whether the partner belongs to an active internal user (base.group_user)
+    x_is_internal = fields.Boolean(
+        string='Is Internal User',
+        compute='_compute_is_internal',
+        store=True,
+        index=True,
+        readonly=True,
+        help='Checked when the contact is linked to an active internal user'
+    )
+
+    # Set when the partner is an unused duplicate waiting for the collection cron
+    x_duplicate_of_id = fields.Many2one(
+        'res.partner',
+        string='Duplicate Of',
+        index='btree_not_null',
+        ondelete='set null',
+        copy=False,
+        help='Existing customer this contact duplicates; the contact is deleted by a scheduled action if still unused'
+    )
+
+    def _auto_init(self):
+        # Create the phone key columns up front so that installing the module does not compute
+        # them for the whole partner table at once: existing rows are filled by the backfill cron
+        for column in ('x_phone_e164', 'x_phone_suffix'):
+            if not column_exists(self.env.cr, self._table, column):
+                create_column(self.env.cr, self._table, column, 'varchar')
+
+        # Same for the internal flag, which is only set for the few partners of internal users
+        if not column_exists(self.env.cr, self._table, 'x_is_internal'):
+            create_column(self.env.cr, self._table, 'x_is_internal', 'bool')
+            self.env.cr.execute("""
+                UPDATE res_partner partner
+                   SET x_is_internal = TRUE
+                  FROM res_users users
+                 WHERE users.partner_id = partner.id
+                   AND users.active
+                   AND NOT users.share
+            """)
+        return super(ResPartner, self)._auto_init()
+
+    def write(self, vals):
+        """Override write to invalidate the internal email cache when a user's email changes"""
+        result = super(ResPartner, self).write(vals)
+        if 'email' in vals and self.user_ids:
+            self.env.registry.clear_cache()
+        return result
+
+    @api.depends('phone', 'country_id.phone_code', 'company_id.country_id.phone_code')
+    def _compute_phone_keys(self):
+        """
+        Compute Phone Keys - normalizes the phone number for customer matching
+        National numbers are expanded with the calling code of the partner's country,
+        or of its company's country
+        """
+        for partner in self:
+            country = partner.country_id or partner.company_id.country_id
+            e164, suffix = phone_keys(partner.phone, country.phone_code)
+            partner.x_phone_e164 = e164
+            partner.x_phone_suffix = suffix
+
+    @api.depends('user_ids.active', 'user_ids.share')
+    def _compute_is_internal(self):
+        """
+        Compute Is Internal - a partner is internal when one of its active users is an internal user
+        Kept in sync by the ORM when users are (de)activated or change groups
+        """
+        for partner in self:
+            partner.x_is_internal = any(
+                user.active and not user.share
+                for user in partner.with_context(active_test=False).user_ids
+            )
+
+    def _get_referenced_partner_ids(self, exclude_event_ids=()):
+        """
+        Return the IDs of the partners in self that are still referenced as calendar event
+        organizer, calendar attendee or CRM lead customer, with one grouped count per model
+        Archived records count as references too, so that they never lose their partner
+
+        Args:
+            exclude_event_ids: calendar events whose organizer and attendees are ignored
+
+        Returns:
+            set: referenced partner IDs
+        """
+        if not self:
+            return set()
+
+        exclude_event_ids = list(exclude_event_ids)
+        reference_checks = [
+            ('calendar.event', [('partner_id', 'in', self.ids), ('id', 'not in', exclude_event_ids)]),
+            ('calendar.attendee', [('partner_id', 'in', self.ids), ('event_id', 'not in', exclude_event_ids)]),
+            ('crm.lead', [('partner_id', 'in', self.ids)]),
+        ]
+
+        referenced_ids = set()
+        for model_name, domain in reference_checks:
+            groups = self.env[model_name].sudo().with_context(active_test=False)._read_group(
+                domain, groupby=['partner_id'], aggregates=['__count'])
+            referenced_ids.update(partner.id for partner, count in groups if count)
+        return referenced_ids
+
+    def _mark_as_duplicate_of(self, customer):
+        """Mark the partners in self as duplicates of customer, to be deleted by the collection cron"""
+        self.with_context(tracking_disable=True).write({'x_duplicate_of_id': customer.id})
+
+    @api.model
+    def _cron_collect_duplicate_partners(self, batch_size=500):
+        """
+        Collect Duplicate Partners - Scheduled Action
+        Deletes the partners marked as duplicates, in chunks, once they are verified to be unused
+        Partners that are referenced again, or that cannot be deleted, are unmarked and kept
+        Logs a report of every removed partner
+
+        Returns:
+            list: (id, name, duplicate_of_id) of the removed partners
+        """
+        cron = self.env['ir.cron']
+        removed = []
+        kept_count = 0
+        last_id = 0
+        while True:
+            candidates = self.with_context(active_test=False).search([
+                ('id', '>', last_id),
+                ('x_duplicate_of_id', '!=', False),
+            ], order='id', limit=batch_size)
+            if not candidates:
+                break
+            last_id = candidates[-1].id
+
+            # Verify the candidates are still unused
+            referenced_ids = candidates._get_referenced_partner_ids()
+            in_use = candidates.filtered(lambda p: p.id in referenced_ids)
+            to_remove = candidates - in_use
+
+            batch_report = [(partner.id, partner.name, partner.x_duplicate_of_id.id) for partner in to_remove]
+            try:
+                with self.env.cr.savepoint():
+                    to_remove.unlink()
+            except Exception as e:
+                # Fall back to one partner at a time to find the ones that cannot be deleted
+                _logger.warning("Duplicate collection: bulk delete failed (%s), retrying one by one", str(e))
+                batch_report = []
+                for partner in to_remove:
+                    report_line = (partner.id, partner.name, partner.x_duplicate_of_id.id)
+                    try:
+                        with self.env.cr.savepoint():
+                            partner.unlink()
+                        batch_report.append(report_line)
+                    except Exception as delete_error:
+                        _logger.warning("Could not delete duplicate %s (ID: %s): %s",
+                                      partner.name, partner.id, str(delete_error))
+                        in_use |= partner
+
+            if in_use:
+                in_use._mark_as_duplicate_of(self.browse())
+                kept_count += len(in_use)
+
+            for partner_id, partner_name, duplicate_of_id in batch_report:
+                _logger.info("Duplicate collection: deleted partner %s (ID: %s), duplicate of partner ID %s",
+                           partner_name, partner_id, duplicate_of_id)
+            removed.extend(batch_report)
+
+            self.env.invalidate_all()
+            if not cron._commit_progress(len(candidates)):
+                break
+
+        _logger.info("Duplicate collection: %s partners deleted, %s kept", len(removed), kept_count)
+        return removed
+
+    @api.model
+    def _get_duplicate_phone_buckets(self, after_suffix='', limit=None):
+        """Return the phone suffixes shared by several unmarked customers, in suffix order"""
+        groups = self._read_group(
+            [
+                ('x_phone_suffix', '>', after_suffix),
+                ('x_is_internal', '=', False),
+                ('x_duplicate_of_id', '=', False),
+            ],
+            groupby=['x_phone_suffix'],
+            having=[('__count', '>', 1)],
+            order='x_phone_suffix',
+            limit=limit,
+        )
+        return [suffix for suffix, in groups]
+
+    @api.model
+    def _dedup_phone_buckets(self, suffixes, dry_run=False):
+        """
+        Deduplicate the customers sharing the given phone suffixes
+        The oldest customer of each bucket is kept, like in the customer assignment rule of calendar
+        events; the events (as attendee or organizer), attendees and opportunities of the other
+        customers are moved to it and the other customers are marked for the duplicate collection cron
+        All the buckets are processed together: one search per model, then one write per kept customer
+
+        Args:
+            suffixes: phone suffixes of the buckets to process
+            dry_run: only build the report, without writing anything
+
+        Returns:
+            list: one dict per bucket with suffix, customer_id, duplicate_ids, event_count and lead_count
+        """
+        partners = self.search_fetch([
+            ('x_phone_suffix', 'in', list(suffixes)),
+            ('x_is_internal', '=', False),
+            ('x_duplicate_of_id', '=', False),
+        ], ['x_phone_suffix'], order='create_date, id')
+
+        buckets = []
+        customer_by_duplicate = {}
+        for suffix, bucket in partners.grouped('x_phone_suffix').items():
+            if len(bucket) > 1:
+                buckets.append((suffix, bucket[0], bucket[1:]))
+                for duplicate in bucket[1:]:
+                    customer_by_duplicate[duplicate.id] = bucket[0]
+        if not buckets:
+            return []
+
+        duplicate_ids = list(customer_by_duplicate)
+        events = self.env['calendar.event'].with_context(
+            active_test=False,
+            skip_calendar_automation=True,
+            dont_notify=True,
+            no_mail_to_attendees=True,
+        ).search_fetch([
+            '|',
+            ('partner_ids', 'in', duplicate_ids),
+            ('partner_id', 'in', duplicate_ids),
+        ], ['partner_ids', 'partner_id'])
+        leads = self.env['crm.lead'].with_context(active_test=False).search_fetch(
+            [('partner_id', 'in', duplicate_ids)], ['partner_id'])
+
+        # Records to move, grouped by the customer they move to
+        attendee_events = defaultdict(lambda: events.browse())
+        organizer_events = defaultdict(lambda: events.browse())
+        customer_leads = defaultdict(lambda: leads.browse())
+        for event in events:
+            for partner in event.partner_ids:
+                if partner.id in customer_by_duplicate:
+                    attendee_events[customer_by_duplicate[partner.id]] |= event
+            if event.partner_id.id in customer_by_duplicate:
+                organizer_events[customer_by_duplicate[event.partner_id.id]] |= event
+        for lead in leads:
+            customer_leads[customer_by_duplicate[lead.partner_id.id]] |= lead
+
+        report = [{
+            'suffix': suffix,
+            'customer_id': customer.id,
+            'duplicate_ids': duplicates.ids,
+            'event_count': len(attendee_events[customer] | organizer_events[customer]),
+            'lead_count': len(customer_leads[customer]),
+        } for suffix, customer, duplicates in buckets]
+        if dry_run:
+            return report
+
+        for __, customer, duplicates in buckets:
+            if attendee_events[customer]:
+                attendee_events[customer].write({
+                    'partner_ids': [(3, duplicate_id) for duplicate_id in duplicates.ids] + [(4, customer.id)],
+                })
+            if organizer_events[customer]:
+                organizer_events[customer].write({'partner_id': customer.id})
+            if customer_leads[customer]:
+                customer_leads[customer].write({'partner_id': customer.id})
+
+        # Attendees left on a duplicate (not in the event's partners) are moved or removed
+        Attendee = self.env['calendar.attendee'].sudo()
+        leftover_attendees = Attendee.search_fetch([('partner_id', 'in', duplicate_ids)], ['event_id', 'partner_id'])
+        if leftover_attendees:
+            customer_ids = {customer_by_duplicate[partner_id] for partner_id in leftover_attendees.partner_id.ids}
+            existing_pairs = {
+                (attendee.event_id.id, attendee.partner_id.id)
+                for attendee in Attendee.search_fetch([
+                    ('event_id', 'in', leftover_attendees.event_id.ids),
+                    ('partner_id', 'in', [customer.id for customer in customer_ids]),
+                ], ['event_id', 'partner_id'])
+            }
+            redundant = Attendee.browse()
+            moved_attendees = defaultdict(Attendee.browse)
+            for attendee in leftover_attendees:
+                customer = customer_by_duplicate[attendee.partner_id.id]
+                if (attendee.event_id.id, customer.id) in existing_pairs:
+                    redundant |= attendee
+                else:
+                    moved_attendees[customer] |= attendee
+                    existing_pairs.add((attendee.event_id.id, customer.id))
+            redundant.unlink()
+            for customer, attendees in moved_attendees.items():
+                attendees.write({'partner_id': customer.id})
+
+        for __, customer, duplicates in buckets:
+            duplicates._mark_as_duplicate_of(customer)
+
+        return report
+
+    @api.model
+    def _cron_dedup_phone_buckets(self, batch_size=200, dry_run=False):
+        """
+        Deduplicate Customers By Phone - Scheduled Action
+        Processes the phone buckets shared by several customers in suffix order, batch_size buckets per chunk
+        The last processed suffix is saved with each chunk, so that an interrupted run resumes where it stopped
+        With dry_run, nothing is written, the whole run starts from the first bucket and the report is
+        saved as a CSV attachment (see _save_dedup_report)
+
+        Returns:
+            list: report of the processed buckets (see _dedup_phone_buckets), only kept for dry runs
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        cron = self.env['ir.cron']
+        after_suffix = '' if dry_run else params.get_param(DEDUP_CURSOR_PARAM, '')
+        report = []
+        bucket_count = duplicate_count = 0
+        while True:
+            suffixes = self._get_duplicate_phone_buckets(after_suffix, limit=batch_size)
+            if not suffixes:
+                if not dry_run:
+                    params.set_param(DEDUP_CURSOR_PARAM, False)
+                    cron._commit_progress(deactivate=True)
+                break
+
+            batch_report = self._dedup_phone_buckets(suffixes, dry_run=dry_run)
+            after_suffix = suffixes[-1]
+            bucket_count += len(batch_report)
+            duplicate_count += sum(len(line['duplicate_ids']) for line in batch_report)
+            if dry_run:
+                report.extend(batch_report)
+            else:
+                params.set_param(DEDUP_CURSOR_PARAM, after_suffix)
+
+            # Keep memory bounded over the whole table
+            self.env.invalidate_all()
+
+            _logger.info("Phone deduplication%s: %s buckets processed up to suffix %s",
+                       ' (dry run)' if dry_run else '', len(batch_report), after_suffix)
+            if not cron._commit_progress(len(suffixes)):
+                break
+
+        _logger.info("Phone deduplication%s: %s buckets, %s duplicates",
+                   ' (dry run)' if dry_run else '', bucket_count, duplicate_count)
+        if dry_run:
+            # Scheduled actions drop the returned report: save it so the dry run can be reviewed
+            self._save_dedup_report(report)
+        return report
+
+    @api.model
+    def _save_dedup_report(self, report):
+        """Save a phone deduplication report as a CSV attachment (one line per bucket) and return it"""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['suffix', 'customer_id', 'duplicate_ids', 'event_count', 'lead_count'])
+        for line in report:
+            writer.writerow([
+                line['suffix'],
+                line['customer_id'],
+                ' '.join(str(duplicate_id) for duplicate_id in line['duplicate_ids']),
+                line['event_count'],
+                line['lead_count'],
+            ])
+        attachment = self.env['ir.attachment'].sudo().create({
+            'name': 'phone_dedup_dry_run_%s.csv' % fields.Datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'raw': output.getvalue().encode(),
+            'mimetype': 'text/csv',
+        })
+        _logger.info("Phone deduplication (dry run): report of %s buckets saved in attachment ID %s",
+                   len(report), attachment.id)
+        return attachment
+
+    @api.model
+    def _cron_backfill_phone_keys(self, batch_size=1000):
+        """
+        Backfill Phone Keys - Scheduled Action
+        Computes the phone keys of existing partners in chunks, committing after each chunk
+        Deactivates itself once every partner with a phone number has been processed
+        """
+        cron = self.env['ir.cron']
+        last_id = 0
+        while True:
+            partners = self.with_context(active_test=False).search([
+                ('id', '>', last_id),
+                ('phone', '!=', False),
+                ('x_phone_suffix', '=', False),
+            ], order='id', limit=batch_size)
+
+            if not partners:
+                _logger.info("Phone key backfill complete")
+                cron._commit_progress(deactivate=True)
+                return
+
+            batch_count = len(partners)
+            self.env.add_to_compute(self._fields['x_phone_e164'], partners)
+            self.env.add_to_compute(self._fields['x_phone_suffix'], partners)
+            partners.flush_recordset(['x_phone_e164', 'x_phone_suffix'])
+            last_id = partners[-1].id
+
+            # Keep memory bounded over the whole table
+            self.env.invalidate_all()
+
+            _logger.info("Phone key backfill: processed %s partners up to ID %s", batch_count, last_id)
+            if not cron._commit_progress(batch_count):
+                return
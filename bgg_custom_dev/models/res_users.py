@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models, tools
+
+# res.users fields that change the set of internal user emails
+INTERNAL_EMAIL_FIELDS = {'active', 'share', 'email', 'partner_id', 'group_ids'}
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to invalidate the internal email cache"""
+        users = super(ResUsers, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return users
+
+    def write(self, vals):
+        """Override write to invalidate the internal email cache when it may have changed"""
+        result = super(ResUsers, self).write(vals)
+        if INTERNAL_EMAIL_FIELDS & vals.keys():
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        """Override unlink to invalidate the internal email cache"""
+        result = super(ResUsers, self).unlink()
+        self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @tools.ormcache()
+    def _get_internal_emails(self):
+        """
+        Internal Email Set
+        Returns the normalized (stripped, lowercase) emails of all active internal users
+        Cached per database, invalidated on every worker when users are created, deleted,
+        (de)activated, change groups or email, or when the email of a user's partner changes
+
+        Returns:
+            frozenset: normalized internal user emails
+        """
+        internal_users = self.sudo().search_fetch([
+            ('share', '=', False),  # Internal users (not portal users)
+            ('active', '=', True)
+        ], ['email'])
+        return frozenset(
+            user.email.strip().lower()
+            for user in internal_users
+            if user.email
+        )
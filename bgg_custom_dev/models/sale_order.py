@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from odoo import models
+
+from odoo.addons.project.models.project_task import CLOSED_STATES
+
+from ..tools import automation_rule
+from .project_task import WELCOME_CALL_DELAY
+
+_logger = logging.getLogger(__name__)
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    def write(self, vals):
+        """Override write to move the welcome call deadlines when orders are re-dated"""
+        result = super(SaleOrder, self).write(vals)
+
+        if 'date_order' in vals:
+            self._update_welcome_call_deadlines()
+
+        return result
+
+    @automation_rule
+    def _update_welcome_call_deadlines(self):
+        """
+        Update Welcome Call Deadlines - Automation Rule
+        Sets the deadline of the open welcome call tasks of the orders to 2 days after their order date
+        The orders of one write share their date: all their tasks are updated with one search and one write
+        """
+        try:
+            for order_date, orders in self.grouped('date_order').items():
+                if not order_date:
+                    continue
+
+                tasks = self.env['project.task'].sudo().search([
+                    ('x_is_welcome_call', '=', True),
+                    ('state', 'not in', list(CLOSED_STATES)),
+                    '|',
+                    ('sale_order_id', 'in', orders.ids),
+                    ('project_id.sale_order_id', 'in', orders.ids),
+                ])
+                deadline_date = order_date + WELCOME_CALL_DELAY
+                tasks_to_update = tasks.filtered(lambda t: t.date_deadline != deadline_date)
+                if tasks_to_update:
+                    tasks_to_update.write({'date_deadline': deadline_date})
+                    _logger.info("Welcome call deadline moved to %s for tasks %s after re-dating orders %s",
+                               deadline_date, tasks_to_update.ids, orders.ids)
+
+        except Exception as e:
+            _logger.error("Update Welcome Call Deadlines - Error processing orders %s: %s",
+                        self.ids, str(e), exc_info=True)
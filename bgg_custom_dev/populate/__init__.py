@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+# Load-testing data for the automation rules, generated from an Odoo shell:
+#   odoo-bin shell -c odoo.conf -d load_database
+#   >>> from odoo.addons.bgg_custom_dev.populate import populate
+#   >>> populate(env, 'medium'); env.cr.commit()
+# (the Odoo 19 populate command only duplicates existing rows, it does not call model factories)
+
+import logging
+import random
+
+from .appointment_answer_input import populate_answers
+from .calendar_event import populate_events
+from .project import populate_projects
+from .res_partner import populate_partners
+
+_logger = logging.getLogger(__name__)
+
+# Number of partners, appointments and projects per scale (one questionnaire of 7 answers per appointment)
+POPULATE_SIZES = {
+    'small': {'partners': 100, 'events': 50, 'projects': 10},
+    'medium': {'partners': 10_000, 'events': 5_000, 'projects': 500},
+    'large': {'partners': 250_000, 'events': 150_000, 'projects': 5_000},
+}
+
+
+def populate(env, size='small', seed='bgg_custom_dev'):
+    """
+    Generate the load-testing data of the given scale (see POPULATE_SIZES), without committing
+
+    Returns:
+        dict: IDs of the created records per model
+    """
+    sizes = POPULATE_SIZES[size]
+    rng = random.Random(seed)
+    env = env['res.partner'].sudo().env
+
+    partner_ids = populate_partners(env, sizes['partners'], rng)
+    event_ids = populate_events(env, sizes['events'], partner_ids, rng)
+    answer_ids = populate_answers(env, event_ids, rng)
+    project_ids, task_ids = populate_projects(env, sizes['projects'], partner_ids, rng)
+
+    _logger.info("Populated %s: %s partners, %s appointments, %s answers, %s projects, %s tasks",
+                 size, len(partner_ids), len(event_ids), len(answer_ids), len(project_ids), len(task_ids))
+    return {
+        'res.partner': partner_ids,
+        'calendar.event': event_ids,
+        'appointment.answer.input': answer_ids,
+        'project.project': project_ids,
+        'project.task': task_ids,
+    }
+
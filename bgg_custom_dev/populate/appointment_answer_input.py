@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+from ..models.appointment_question import QUESTION_CODES
+from .common import create_in_chunks
+
+# Questionnaire answered for each appointment, in order
+ANSWERED_CODES = ['spouse_name', 'spouse_phone', 'street', 'zip', 'city', 'need', 'sms_confirmation']
+
+NEEDS = ['Pompe à chaleur', 'Panneaux solaires', 'Isolation toiture', 'Isolation murs']
+SMS_CONFIRMATIONS = ['Oui', 'Non']
+
+# Questions answered with one of their answer options (value_answer_id), with their type and options
+SELECT_QUESTIONS = {
+    'need': ('checkbox', NEEDS),
+    'sms_confirmation': ('select', SMS_CONFIRMATIONS),
+}
+CITIES = [('1000', 'Bruxelles'), ('4000', 'Liège'), ('5000', 'Namur'), ('6000', 'Charleroi'), ('7000', 'Mons')]
+
+
+def populate_answers(env, event_ids, rng):
+    """
+    Create the complete questionnaire of each appointment (one answer per ANSWERED_CODES),
+    answered by its customer
+
+    Returns:
+        list: IDs of the created answers
+    """
+    events = env['calendar.event'].search_fetch([('id', 'in', event_ids)], ['partner_ids', 'appointment_type_id'])
+    questions = {
+        appointment_type.id: populate_questions(env, appointment_type)
+        for appointment_type in events.appointment_type_id
+    }
+
+    vals_list = []
+    for index, event in enumerate(events):
+        question_ids, option_ids = questions[event.appointment_type_id.id]
+        zip_code, city = CITIES[index % len(CITIES)]
+        values = {
+            'spouse_name': 'Conjoint %s' % index,
+            'spouse_phone': '+32 4%08d' % rng.randrange(100_000_000),
+            'street': 'Rue du Populate %s' % rng.randrange(1, 300),
+            'zip': zip_code,
+            'city': city,
+        }
+        for code in ANSWERED_CODES:
+            vals_list.append({
+                'calendar_event_id': event.id,
+                'partner_id': event.partner_ids[:1].id,
+                'question_id': question_ids[code],
+                'value_text_box': values.get(code, False),
+                'value_answer_id': rng.choice(option_ids[code]) if code in SELECT_QUESTIONS else False,
+            })
+    return create_in_chunks(env['appointment.answer.input'], vals_list)
+
+
+def populate_questions(env, appointment_type):
+    """
+    Return the questions of the answered codes on the appointment type, creating the missing
+    questions and answer options
+
+    Returns:
+        tuple: ({code: question_id}, {code: [answer_id]} for the SELECT_QUESTIONS codes)
+    """
+    Question = env['appointment.question'].sudo()
+    question_codes = Question._get_question_codes()
+    question_ids = {}
+    for question in appointment_type.question_ids:
+        if question.id in question_codes:
+            question_ids.setdefault(question_codes[question.id], question.id)
+    for code in ANSWERED_CODES:
+        if code not in question_ids:
+            question_type = SELECT_QUESTIONS[code][0] if code in SELECT_QUESTIONS else 'char'
+            question_ids[code] = Question.create({
+                'name': QUESTION_CODES[code],
+                'question_type': question_type,
+                'x_question_code': code,
+                'appointment_type_id': appointment_type.id,
+            }).id
+
+    option_ids = {}
+    for code, (__, option_names) in SELECT_QUESTIONS.items():
+        question = Question.browse(question_ids[code])
+        options = question.answer_ids.filtered(lambda answer: answer.name in option_names)
+        missing_names = [name for name in option_names if name not in options.mapped('name')]
+        if missing_names:
+            options |= env['appointment.answer'].sudo().create([{
+                'name': name,
+                'question_id': question.id,
+            } for name in missing_names])
+        option_ids[code] = options.ids
+    return question_ids, option_ids
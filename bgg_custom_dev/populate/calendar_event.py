@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+from ..models.appointment_type import ALL_APPOINTMENT_REFS
+from .common import create_in_chunks
+
+# Appointment statuses of the populated appointments, with their weights
+APPOINTMENT_STATUSES = (['booked', 'attended', 'no_show'], [0.8, 0.1, 0.1])
+
+
+def populate_events(env, count, partner_ids, rng):
+    """
+    Create appointments of the automated types, with a customer attendee and some NoShows
+
+    Returns:
+        list: IDs of the created appointments
+    """
+    partner_phones = {
+        partner.id: partner.phone
+        for partner in env['res.partner'].with_context(active_test=False).search_fetch(
+            [('id', 'in', partner_ids)], ['phone'])
+    }
+    appointment_type_ids = populate_appointment_types(env).ids
+
+    vals_list = []
+    for counter in range(count):
+        customer_id = partner_ids[(counter * 7919) % len(partner_ids)]
+        phone = partner_phones.get(customer_id)
+        start = datetime.datetime(2024, 1, 1, 8) + datetime.timedelta(
+            days=rng.randrange(365), hours=rng.randrange(10))
+        vals_list.append({
+            'name': 'Appointment %s' % counter,
+            'start': start,
+            'stop': start + datetime.timedelta(hours=1),
+            'appointment_type_id': appointment_type_ids[counter % len(appointment_type_ids)],
+            'appointment_status': rng.choices(*APPOINTMENT_STATUSES)[0],
+            'partner_ids': [(4, customer_id)],
+            'x_studio_customer_phone': '<a href="tel:%s">%s</a>' % (phone, phone) if phone else False,
+        })
+    return create_in_chunks(env['calendar.event'].with_context(no_mail_to_attendees=True, dont_notify=True),
+                            vals_list)
+
+
+def populate_appointment_types(env):
+    """Return the appointment types of every automated reference, creating the missing ones"""
+    AppointmentType = env['appointment.type'].sudo()
+    appointment_types = AppointmentType.search([('x_appointment_ref', 'in', ALL_APPOINTMENT_REFS)])
+    missing_refs = set(ALL_APPOINTMENT_REFS) - set(appointment_types.mapped('x_appointment_ref'))
+    if missing_refs:
+        appointment_types |= AppointmentType.create([{
+            'name': 'Populate %s' % appointment_ref,
+            'x_appointment_ref': appointment_ref,
+        } for appointment_ref in sorted(missing_refs)])
+    return appointment_types
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+# Records created per ORM call; the cache is emptied after each chunk to keep memory bounded
+POPULATE_CHUNK_SIZE = 1000
+
+
+def create_in_chunks(model, vals_list):
+    """Create the records of vals_list in chunks, and return their IDs"""
+    ids = []
+    for start in range(0, len(vals_list), POPULATE_CHUNK_SIZE):
+        ids += model.create(vals_list[start:start + POPULATE_CHUNK_SIZE]).ids
+        model.env.flush_all()
+        model.env.invalidate_all()
+    return ids
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from .common import create_in_chunks
+
+# Share of projects linked to a sales order line, like the projects created from quotations
+SOLD_PROJECT_RATIO = 0.8
+
+# Share of tasks named "Welcom call", like the tasks of the project templates
+WELCOME_CALL_RATIO = 0.1
+
+TASKS_PER_PROJECT = 5
+
+
+def populate_projects(env, count, partner_ids, rng):
+    """
+    Create projects, most of them sold through a sales order line, each with a few tasks
+
+    Returns:
+        tuple: (project IDs, task IDs)
+    """
+    product = env['product.product'].search([('name', '=', 'Populate Service')], limit=1)
+    if not product:
+        product = env['product.product'].create({'name': 'Populate Service', 'type': 'service'})
+
+    sold_count = int(count * SOLD_PROJECT_RATIO)
+    order_ids = create_in_chunks(env['sale.order'], [{
+        'partner_id': rng.choice(partner_ids),
+        'order_line': [(0, 0, {'product_id': product.id, 'product_uom_qty': 1})],
+    } for __ in range(sold_count)])
+    sale_line_ids = env['sale.order.line'].search([('order_id', 'in', order_ids)]).ids
+
+    project_vals_list = []
+    for counter in range(count):
+        sale_line_id = sale_line_ids[counter] if counter < len(sale_line_ids) else False
+        project_vals_list.append({
+            'name': 'Populate Project %s' % counter,
+            'partner_id': rng.choice(partner_ids),
+            'sale_line_id': sale_line_id,
+        })
+    project_ids = create_in_chunks(env['project.project'], project_vals_list)
+
+    task_vals_list = []
+    for project_id in project_ids:
+        for __ in range(TASKS_PER_PROJECT):
+            counter = len(task_vals_list)
+            task_vals_list.append({
+                'name': 'Welcom call' if rng.random() < WELCOME_CALL_RATIO else 'Task %s' % counter,
+                'project_id': project_id,
+            })
+    task_ids = create_in_chunks(env['project.task'], task_vals_list)
+    return project_ids, task_ids
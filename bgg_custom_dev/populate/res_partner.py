@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from .common import create_in_chunks
+
+_logger = logging.getLogger(__name__)
+
+# Share of customers whose phone number is also used by other customers
+DUPLICATE_PHONE_RATIO = 0.2
+
+# Share of partners tagged "Call Center" (agents appointments are taken on behalf of)
+CALL_CENTER_RATIO = 0.01
+
+# Ways the same Belgian mobile number is typed in
+PHONE_FORMATS = ['+32 4%08d', '04%08d', '0032 4%08d', '+324%08d']
+
+
+def populate_partners(env, count, rng):
+    """
+    Create customers with realistic phone numbers: some customers share a number, typed in
+    different formats; a few partners are tagged "Call Center"
+
+    Returns:
+        list: IDs of the created partners
+    """
+    country_belgium = env.ref('base.be')
+
+    vals_list = []
+    for counter in range(count):
+        if rng.random() < DUPLICATE_PHONE_RATIO:
+            # Duplicate clusters: pick among a pool growing with the population
+            subscriber = 70_000_000 + rng.randrange(counter // 5 + 1)
+        else:
+            subscriber = 80_000_000 + counter
+        vals_list.append({
+            'name': 'Populate Customer %s' % counter,
+            'phone': rng.choice(PHONE_FORMATS) % subscriber,
+            'country_id': country_belgium.id,
+        })
+    partner_ids = create_in_chunks(env['res.partner'], vals_list)
+
+    category = env['res.partner.category'].search([('name', '=', 'Call Center')], limit=1)
+    if not category:
+        category = env['res.partner.category'].create({'name': 'Call Center'})
+
+    call_center_count = max(1, int(len(partner_ids) * CALL_CENTER_RATIO))
+    call_center_partners = env['res.partner'].browse(rng.sample(partner_ids, min(call_center_count, len(partner_ids))))
+    call_center_partners.write({'category_id': [(4, category.id)]})
+    _logger.info("Tagged %s partners as Call Center", len(call_center_partners))
+
+    return partner_ids
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
 from . import test_appointment_answer_input
+from . import test_automation_stats
+from . import test_benchmark
 from . import test_calendar_event
 from . import test_project_project
 from . import test_project_task
+from . import test_res_partner
+from . import test_res_users
+from . import test_sale_order
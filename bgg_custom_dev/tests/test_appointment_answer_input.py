@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import datetime
+from unittest.mock import patch
 from odoo.tests.common import TransactionCase
 from odoo.tests import tagged
 import logging
@@ -19,11 +20,6 @@ class TestAppointmentAnswerInput(TransactionCase):
     def setUpClass(cls):
         super().setUpClass()
 
-        # Skip tests if appointment module not installed
-        if 'calendar.appointment.type' not in cls.env:
-            cls.skipTest(cls, "Appointment module not installed")
-            return
-
         # Create test partner (customer)
         cls.test_partner = cls.env['res.partner'].create({
             'name': 'Test Customer',
@@ -31,9 +27,10 @@ class TestAppointmentAnswerInput(TransactionCase):
             'email': 'testcustomer@example.com',
         })
 
-        # Create appointment type
-        cls.appointment_type = cls.env['calendar.appointment.type'].create({
+        # Create appointment type with a call center reference (all answer rules apply)
+        cls.appointment_type = cls.env['appointment.type'].sudo().create({
             'name': 'Test Appointment Type',
+            'x_appointment_ref': 'APT-ENERG-CNT',
         })
 
         # Create calendar event
@@ -47,32 +44,38 @@ class TestAppointmentAnswerInput(TransactionCase):
 
         # Create appointment questions
         cls.question_conjoint_name = cls.env['appointment.question'].create({
-            'display_name': 'Nom du conjoint',
+            'name': 'Nom du conjoint',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'text',
         })
 
         cls.question_conjoint_phone = cls.env['appointment.question'].create({
-            'display_name': 'Numéro de téléphone du conjoint',
+            'name': 'Numéro de téléphone du conjoint',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'text',
         })
 
         cls.question_address = cls.env['appointment.question'].create({
-            'display_name': 'Adresse',
+            'name': 'Adresse',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'text',
         })
 
         cls.question_postal_code = cls.env['appointment.question'].create({
-            'display_name': 'Code Postale',
+            'name': 'Code Postale',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'text',
         })
 
         cls.question_city = cls.env['appointment.question'].create({
-            'display_name': 'Ville',
+            'name': 'Ville',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'text',
         })
 
         cls.question_country = cls.env['appointment.question'].create({
-            'display_name': 'Pays',
+            'name': 'Pays',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'select',
         })
 
@@ -83,7 +86,8 @@ class TestAppointmentAnswerInput(TransactionCase):
         })
 
         cls.question_besoin = cls.env['appointment.question'].create({
-            'display_name': 'Besoin',
+            'name': 'Besoin',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'checkbox',
         })
 
@@ -98,7 +102,8 @@ class TestAppointmentAnswerInput(TransactionCase):
         })
 
         cls.question_sms_confirmation = cls.env['appointment.question'].create({
-            'display_name': 'Confirmation du rendez-vous par SMS',
+            'name': 'Confirmation du rendez-vous par SMS',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'select',
         })
 
@@ -113,7 +118,8 @@ class TestAppointmentAnswerInput(TransactionCase):
         })
 
         cls.question_rendez_vous_behalf = cls.env['appointment.question'].create({
-            'display_name': 'Rendez-vous pris à la place de',
+            'name': 'Rendez-vous pris à la place de',
+            'appointment_type_id': cls.appointment_type.id,
             'question_type': 'select',
         })
 
@@ -556,3 +562,221 @@ class TestAppointmentAnswerInput(TransactionCase):
         ])
         self.assertEqual(len(spouse), 1,
                         "Spouse should be created")
+
+    def test_batch_create_groups_answers_by_event(self):
+        """Test that a batch of answers for one event is processed as a single group"""
+        new_partner = self.env['res.partner'].create({
+            'name': 'Batch Group Customer',
+            'phone': '+32455555555',
+        })
+
+        new_event = self.env['calendar.event'].create({
+            'name': 'Batch Group Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'appointment_type_id': self.appointment_type.id,
+            'partner_ids': [(4, new_partner.id)],
+        })
+
+        # Spouse name and phone arrive in the same booking
+        self.env['appointment.answer.input'].create([
+            {
+                'partner_id': new_partner.id,
+                'question_id': self.question_conjoint_name.id,
+                'value_text_box': 'Batch Spouse',
+                'calendar_event_id': new_event.id,
+            },
+            {
+                'partner_id': new_partner.id,
+                'question_id': self.question_conjoint_phone.id,
+                'value_text_box': '+32466666666',
+                'calendar_event_id': new_event.id,
+            },
+            {
+                'partner_id': new_partner.id,
+                'question_id': self.question_postal_code.id,
+                'value_text_box': '4000',
+                'calendar_event_id': new_event.id,
+            },
+            {
+                'partner_id': new_partner.id,
+                'question_id': self.question_city.id,
+                'value_text_box': 'Liège',
+                'calendar_event_id': new_event.id,
+            },
+        ])
+
+        new_partner.invalidate_recordset()
+        new_event.invalidate_recordset()
+
+        # Spouse created once, with the phone from the same batch
+        spouse = self.env['res.partner'].search([
+            ('parent_id', '=', new_partner.id),
+        ])
+        self.assertEqual(len(spouse), 1, "Exactly one spouse should be created")
+        self.assertEqual(spouse.phone, '+32466666666',
+                        "Spouse phone from the same batch should be set on creation")
+
+        # Contact info merged into one partner update
+        self.assertEqual(new_partner.zip, '4000', "Zip should be updated")
+        self.assertEqual(new_partner.city, 'Liège', "City should be updated")
+
+        # Title built once with all components
+        self.assertIn('4000', new_event.name, "Title should contain postal code")
+        self.assertIn(new_partner.name, new_event.name, "Title should contain customer name")
+
+    # ========================
+    # Question Registry
+    # ========================
+
+    def test_question_registry_matches_labels(self):
+        """Test that questions without a code are registered from their label"""
+        question_codes = self.env['appointment.question']._get_question_codes()
+
+        self.assertEqual(question_codes.get(self.question_address.id), 'street',
+                        "Address question should be registered as 'street'")
+        self.assertEqual(question_codes.get(self.question_besoin.id), 'need',
+                        "Besoin question should be registered as 'need'")
+
+    def test_question_registry_uses_explicit_code(self):
+        """Test that a coded question is dispatched whatever its label, and the cache is invalidated"""
+        renamed_question = self.env['appointment.question'].create({
+            'name': 'Rue et numéro',
+            'appointment_type_id': self.appointment_type.id,
+            'question_type': 'text',
+        })
+        self.assertNotIn(renamed_question.id, self.env['appointment.question']._get_question_codes(),
+                        "Unknown label without code should not be registered")
+
+        renamed_question.write({'x_question_code': 'street'})
+
+        self.env['appointment.answer.input'].create({
+            'partner_id': self.test_partner.id,
+            'question_id': renamed_question.id,
+            'value_text_box': '12 Rue Codée',
+            'calendar_event_id': self.calendar_event.id,
+        })
+
+        self.test_partner.invalidate_recordset()
+        self.assertEqual(self.test_partner.street, '12 Rue Codée',
+                        "Coded question should update the partner street")
+
+    # ========================
+    # Answer Aggregates
+    # ========================
+
+    def test_answer_aggregates_follow_answers(self):
+        """Test SMS confirmation and needs are maintained on the event as answers change"""
+        sms_answer = self.env['appointment.answer.input'].create({
+            'partner_id': self.test_partner.id,
+            'question_id': self.question_sms_confirmation.id,
+            'value_answer_id': self.sms_yes_answer.id,
+            'calendar_event_id': self.calendar_event.id,
+        })
+        need_answers = self.env['appointment.answer.input'].create([{
+            'partner_id': self.test_partner.id,
+            'question_id': self.question_besoin.id,
+            'value_answer_id': option.id,
+            'calendar_event_id': self.calendar_event.id,
+        } for option in (self.besoin_answer_1, self.besoin_answer_2)])
+
+        self.assertTrue(self.calendar_event.x_sms_confirmed, "SMS confirmation should be set")
+        self.assertEqual(self.calendar_event.x_selected_needs, 'Panneaux solaires+Batterie',
+                        "Needs should be joined with +")
+
+        sms_answer.value_answer_id = self.sms_no_answer
+        need_answers[1].unlink()
+
+        self.assertFalse(self.calendar_event.x_sms_confirmed, "SMS confirmation should follow the answer")
+        self.assertEqual(self.calendar_event.x_selected_needs, 'Panneaux solaires',
+                        "Deleted needs should be removed")
+
+    # ========================
+    # New Record Detection
+    # ========================
+
+    def test_answer_write_only_reprocesses_new_answers(self):
+        """Test that editing an answer created in an earlier transaction does not run the rules again"""
+        answer = self.env['appointment.answer.input'].create({
+            'partner_id': self.test_partner.id,
+            'question_id': self.question_address.id,
+            'value_text_box': '1 Rue Initiale',
+            'calendar_event_id': self.calendar_event.id,
+        })
+
+        # Answers completed in the creation transaction are processed again, even after a savepoint
+        with self.env.cr.savepoint():
+            self.env['res.partner'].create({'name': 'Savepoint Partner'})
+        answer.write({'value_text_box': '2 Rue Complétée'})
+        self.test_partner.invalidate_recordset()
+        self.assertEqual(self.test_partner.street, '2 Rue Complétée',
+                        "New answers should be processed on write")
+
+        # Simulate a later transaction: the creation marker is cleared on commit
+        self.env.cr.postcommit.data.pop('bgg_custom_dev.new_records.appointment.answer.input', None)
+        answer.write({'value_text_box': '3 Rue Éditée'})
+        self.test_partner.invalidate_recordset()
+        self.assertEqual(self.test_partner.street, '2 Rue Complétée',
+                        "Old answers should not be processed again on write")
+
+    # ========================
+    # Deferred Automation Queue
+    # ========================
+
+    def test_async_answers_are_queued(self):
+        """Test that answers are only queued in deferred mode, then processed by the cron"""
+        self.env['ir.config_parameter'].sudo().set_param('bgg_custom_dev.async_answer_automation', '1')
+
+        answer = self.env['appointment.answer.input'].create({
+            'partner_id': self.test_partner.id,
+            'question_id': self.question_address.id,
+            'value_text_box': '7 Rue Différée',
+            'calendar_event_id': self.calendar_event.id,
+        })
+
+        job = self.env['bgg.automation.job'].search([('event_id', '=', self.calendar_event.id)])
+        self.assertEqual(job.answer_ids, answer, "A job should be queued with the answer")
+        self.assertNotEqual(self.test_partner.street, '7 Rue Différée',
+                           "Rules should not run when the answer is created")
+
+        self.env['bgg.automation.job']._cron_process_jobs()
+
+        self.test_partner.invalidate_recordset()
+        self.assertEqual(self.test_partner.street, '7 Rue Différée', "Rules should run in the cron")
+        self.assertFalse(job.exists(), "Processed jobs should be deleted")
+
+    def test_job_fails_after_max_attempts(self):
+        """Test that a job whose rule raises is retried, then marked failed after MAX_ATTEMPTS runs"""
+        self.env['ir.config_parameter'].sudo().set_param('bgg_custom_dev.async_answer_automation', '1')
+
+        self.env['appointment.answer.input'].create({
+            'partner_id': self.test_partner.id,
+            'question_id': self.question_address.id,
+            'value_text_box': '8 Rue en Erreur',
+            'calendar_event_id': self.calendar_event.id,
+        })
+        job = self.env['bgg.automation.job'].search([('event_id', '=', self.calendar_event.id)])
+
+        # The partner update of _update_contact_info fails on every run
+        with patch.object(type(self.env['res.partner']), 'write', side_effect=ValueError('Boom')):
+            for attempt in range(1, 4):
+                self.env['bgg.automation.job']._cron_process_jobs()
+                self.assertTrue(job.exists(), "A failing job should not be deleted")
+                self.assertEqual(job.attempt_count, attempt, "Each run should count one attempt")
+
+        self.assertEqual(job.state, 'failed', "Job should be failed after MAX_ATTEMPTS attempts")
+        self.assertIn('Boom', job.error_message, "Job should keep the rule error")
+
+    def test_failed_job_retry(self):
+        """Test that a failed job goes back to the queue when retried"""
+        job = self.env['bgg.automation.job'].create({
+            'event_id': self.calendar_event.id,
+            'state': 'failed',
+            'attempt_count': 3,
+            'error_message': 'Boom',
+        })
+
+        job.action_retry()
+
+        self.assertEqual(job.state, 'pending', "Retried job should be pending")
+        self.assertEqual(job.attempt_count, 0, "Retried job should restart its attempts")
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+from odoo.exceptions import AccessError
+from odoo.tests.common import TransactionCase
+from odoo.tests import tagged
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestAutomationStats(TransactionCase):
+    """
+    Test suite for the automation rule instrumentation
+    Tests the per-rule timing and query statistics
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.stats = cls.env['bgg.automation.stats']
+
+    # ========================
+    # Test 1: Rule Statistics
+    # ========================
+
+    def test_rule_calls_are_recorded(self):
+        """Test each rule call adds a sample with percentiles"""
+        self.stats.reset_rule_stats()
+
+        self.env['calendar.event'].create({
+            'name': 'Instrumented Event',
+            'start': '2024-01-15 10:00:00',
+            'stop': '2024-01-15 11:00:00',
+        })
+
+        rule_stats = self.stats.get_rule_stats()
+        self.assertIn('_assign_existing_customer', rule_stats, "Rule should be instrumented")
+        assign_stats = rule_stats['_assign_existing_customer']
+        self.assertGreaterEqual(assign_stats['calls'], 1, "Rule call should be counted")
+        self.assertEqual(set(assign_stats['wall_time']), {'p50', 'p95', 'p99'},
+                        "Wall time percentiles should be reported")
+        self.assertLessEqual(assign_stats['query_count']['p50'], assign_stats['query_count']['p99'],
+                            "Percentiles should be ordered")
+
+    def test_rule_stats_restricted_to_admins(self):
+        """Test non-admin users cannot read the statistics"""
+        user = self.env['res.users'].create({
+            'name': 'Stats User',
+            'login': 'stats_user',
+        })
+        with self.assertRaises(AccessError):
+            self.stats.with_user(user).get_rule_stats()
+
+    # ========================
+    # Test 2: Structured Rule Logs
+    # ========================
+
+    def test_rule_log_records(self):
+        """Test one compact debug record is logged per rule execution"""
+        with self.assertLogs('odoo.addons.bgg_custom_dev.rules', level='DEBUG') as captured:
+            event = self.env['calendar.event'].create({
+                'name': 'Logged Event',
+                'start': '2024-01-15 10:00:00',
+                'stop': '2024-01-15 11:00:00',
+            })
+
+        assign_records = [line for line in captured.output if 'rule=_assign_existing_customer ' in line]
+        self.assertEqual(len(assign_records), 1, "The rule should log exactly one record per execution")
+        self.assertIn('ids=%s' % event.ids, assign_records[0], "The record should contain the event ID")
+        self.assertIn('outcome=done', assign_records[0], "The record should contain the outcome")
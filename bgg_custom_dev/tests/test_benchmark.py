@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from odoo.tests.common import TransactionCase
+from odoo.tests import tagged
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Number of records each automation rule is benchmarked with
+BENCHMARK_SIZES = (1, 10, 100, 1000)
+
+# Query counts per rule and size; a run may exceed them by BGG_BENCHMARK_TOLERANCE (default 10%)
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+
+# Query budget of each rule when the baseline has no count for it: (queries at 1 record, queries per extra record)
+# Batched rules get no per-record queries; rules that search, write or create per record get a few
+# These are upper bounds derived from the rules' code: recording a baseline on the CI database
+# (BGG_BENCHMARK_OUTPUT, copied to benchmark_baseline.json) replaces them with measured counts
+RULE_QUERY_BUDGETS = {
+    '_assign_existing_customer': (20, 3),
+    '_set_initial_organizer': (10, 1),
+    '_update_clickable_from_attendee': (15, 2),
+    '_replace_call_center_emails': (10, 1),
+    '_create_activity_noshow': (30, 10),
+    '_update_calendar_status_rescheduled': (40, 2),
+    '_compute_automation_scope': (5, 0),
+    '_compute_commercial': (10, 0),
+    '_add_conjoint_as_contact': (25, 10),
+    '_update_contact_info': (10, 1),
+    '_update_appointment_title': (15, 2),
+    '_set_partner_on_behalf': (15, 3),
+    '_update_project_folder_name': (10, 1),
+    '_set_welcome_call_deadline': (10, 0),
+}
+
+# When set, the measured query counts and timings are written to this JSON file
+# (same format as the baseline, so that it can be copied over it)
+OUTPUT_PATH_ENV = 'BGG_BENCHMARK_OUTPUT'
+TOLERANCE_ENV = 'BGG_BENCHMARK_TOLERANCE'
+
+
+@tagged('post_install', '-at_install', '-standard', 'bgg_benchmark')
+class TestAutomationBenchmark(TransactionCase):
+    """
+    Benchmark suite for the automation rules (run with --test-tags bgg_benchmark)
+    Runs every rule at 1, 10, 100 and 1000 records and asserts a query budget per size:
+    the baseline query count plus the tolerance when the baseline has one, otherwise
+    the size-1 query count plus the rule's per-record queries (see RULE_QUERY_BUDGETS), plus the tolerance
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as baseline_file:
+                cls.baseline = json.load(baseline_file)
+        cls.tolerance = float(os.environ.get(TOLERANCE_ENV, '0.1'))
+        cls.results = {}
+
+        cls.start = datetime.datetime(2024, 1, 15, 10, 0)
+        cls.country_belgium = cls.env.ref('base.be')
+
+        cls.appointment_type_call_center = cls.env['appointment.type'].sudo().create({
+            'name': 'Benchmark Call Center Appointment',
+            'x_appointment_ref': 'APT-ENERG-CNT',
+        })
+
+        cls.env['mail.activity.type'].create({
+            'name': 'NoShow',
+            'category': 'default',
+        })
+
+        cls.question_codes = {}
+        for code, label, question_type in [
+            ('spouse_name', 'Nom du conjoint', 'char'),
+            ('street', 'Adresse', 'char'),
+            ('zip', 'Code Postale', 'char'),
+            ('need', 'Besoin', 'checkbox'),
+            ('sms_confirmation', 'Confirmation du rendez-vous par SMS', 'select'),
+            ('on_behalf', 'Rendez-vous pris à la place de', 'select'),
+        ]:
+            cls.question_codes[code] = cls.env['appointment.question'].create({
+                'name': label,
+                'appointment_type_id': cls.appointment_type_call_center.id,
+                'question_type': question_type,
+                'x_question_code': code,
+            })
+
+        # Answer options of the select questions answered by _create_answers
+        cls.need_answer = cls.env['appointment.answer'].create({
+            'name': 'Pompe à chaleur',
+            'question_id': cls.question_codes['need'].id,
+        })
+        cls.sms_yes_answer = cls.env['appointment.answer'].create({
+            'name': 'Oui',
+            'question_id': cls.question_codes['sms_confirmation'].id,
+        })
+        cls.behalf_answer = cls.env['appointment.answer'].create({
+            'name': 'Benchmark Call Center Agent',
+            'question_id': cls.question_codes['on_behalf'].id,
+        })
+
+        # Call Center partner matched by the on-behalf answers
+        call_center_category = cls.env['res.partner.category'].create({'name': 'Call Center'})
+        cls.env['res.partner'].create({
+            'name': 'Benchmark Call Center Agent',
+            'category_id': [(4, call_center_category.id)],
+        })
+
+        # Service product of the sales orders linked to the benchmarked projects
+        cls.service_product = cls.env['product.product'].create({
+            'name': 'Benchmark Project Service',
+            'type': 'service',
+            'list_price': 1000.0,
+        })
+
+    @classmethod
+    def tearDownClass(cls):
+        output_path = os.environ.get(OUTPUT_PATH_ENV)
+        if output_path and cls.results:
+            with open(output_path, 'w') as output_file:
+                json.dump(cls.results, output_file, indent=4, sort_keys=True)
+            _logger.info("Benchmark results written to %s", output_path)
+        super().tearDownClass()
+
+    # ========================
+    # Benchmark Helpers
+    # ========================
+
+    def _benchmark_rule(self, rule_name, make_records, run):
+        """
+        Run one rule at every benchmark size and check its query budget
+
+        Args:
+            rule_name: name of the rule, key of the baseline and results
+            make_records: function(size) creating and returning the records the rule runs on
+            run: function(records) running the rule
+        """
+        size_one_queries = None
+        for size in BENCHMARK_SIZES:
+            with self.subTest(rule=rule_name, size=size):
+                records = make_records(size)
+                self.env.flush_all()
+                self.env.invalidate_all()
+
+                budget = self._query_budget(rule_name, size, size_one_queries)
+                query_count = self.cr.sql_log_count
+                start = time.perf_counter()
+                with self.assertQueryCount(budget):
+                    run(records)
+                elapsed = time.perf_counter() - start
+                queries = self.cr.sql_log_count - query_count
+
+                if size == 1:
+                    size_one_queries = queries
+                self.results.setdefault(rule_name, {})[str(size)] = {
+                    'queries': queries,
+                    'time': round(elapsed, 6),
+                }
+                _logger.info("Benchmark %s: %s records, %s queries, %.3fs", rule_name, size, queries, elapsed)
+
+    def _query_budget(self, rule_name, size, size_one_queries):
+        baseline_queries = self.baseline.get(rule_name, {}).get(str(size), {}).get('queries')
+        if baseline_queries is not None:
+            return math.ceil(baseline_queries * (1 + self.tolerance))
+        size_one_budget, record_queries = RULE_QUERY_BUDGETS[rule_name]
+        if size == 1:
+            return size_one_budget
+        # The size-1 budget stands in for the size-1 count when that run failed
+        if size_one_queries is None:
+            size_one_queries = size_one_budget
+        return math.ceil((size_one_queries + record_queries * (size - 1)) * (1 + self.tolerance))
+
+    def _create_customers(self, size):
+        return self.env['res.partner'].create([{
+            'name': 'Benchmark Customer %s' % index,
+            'phone': '+32 470 %06d' % index,
+            'street': 'Rue du Test %s' % index,
+            'zip': '1000',
+            'city': 'Brussels',
+            'country_id': self.country_belgium.id,
+            'email': 'benchmark%s@example.com' % index,
+        } for index in range(size)])
+
+    def _create_events(self, size, customers=None, **values):
+        customers = customers or self._create_customers(size)
+        return self.env['calendar.event'].create([{
+            'name': 'Benchmark Event %s' % index,
+            'start': self.start + datetime.timedelta(hours=index),
+            'stop': self.start + datetime.timedelta(hours=index + 1),
+            'appointment_type_id': self.appointment_type_call_center.id,
+            'partner_ids': [(4, customers[index].id)],
+            **values,
+        } for index in range(size)])
+
+    def _create_answers(self, size):
+        events = self._create_events(size)
+        answer_values = []
+        for event in events:
+            partner = event.partner_ids[:1]
+            for code, value in [
+                ('spouse_name', {'value_text_box': 'Conjoint %s' % event.id}),
+                ('street', {'value_text_box': 'Rue du Benchmark %s' % event.id}),
+                ('zip', {'value_text_box': '4000'}),
+                ('need', {'value_answer_id': self.need_answer.id}),
+                ('sms_confirmation', {'value_answer_id': self.sms_yes_answer.id}),
+                ('on_behalf', {'value_answer_id': self.behalf_answer.id}),
+            ]:
+                answer_values.append({
+                    'partner_id': partner.id,
+                    'question_id': self.question_codes[code].id,
+                    'calendar_event_id': event.id,
+                    **value,
+                })
+        answers = self.env['appointment.answer.input'].create(answer_values)
+
+        # The rules already ran on create: reset what they wrote, so that running them again writes it back
+        events.partner_ids.write({'street': False, 'zip': False})
+        events.with_context(skip_calendar_automation=True).write({
+            'name': 'Benchmark Event',
+            'x_title_zip': False,
+            'x_studio_rendez_vous_pris_la_place_de': False,
+        })
+        return answers
+
+    def _run_answer_rule(self, rule_name):
+        Answer = self.env['appointment.answer.input']
+
+        def run(answers):
+            for event, event_answers in answers.grouped('calendar_event_id').items():
+                if rule_name == '_add_conjoint_as_contact':
+                    Answer._add_conjoint_as_contact(event, event_answers)
+                    continue
+                # The collected updates are written like in _process_appointment_answers
+                partner_updates = defaultdict(dict)
+                event_updates = {}
+                if rule_name == '_update_contact_info':
+                    Answer._update_contact_info(event, event_answers, partner_updates)
+                else:
+                    getattr(Answer, rule_name)(event, event_answers, event_updates)
+                Answer._apply_answer_updates(event, partner_updates, event_updates)
+        return run
+
+    def _create_sold_projects(self, size):
+        """Create projects linked to their own sales order line, with a documents folder"""
+        customers = self._create_customers(size)
+        orders = self.env['sale.order'].create([{
+            'partner_id': customer.id,
+            'date_order': self.start,
+            'order_line': [(0, 0, {
+                'product_id': self.service_product.id,
+                'product_uom_qty': 1,
+                'price_unit': 1000.0,
+            })],
+        } for customer in customers])
+        Folder = self.env[self.env['project.project']._fields['documents_folder_id'].comodel_name]
+        folder_values = {'type': 'folder'} if 'type' in Folder._fields else {}
+        folders = Folder.create([
+            dict(folder_values, name='Benchmark Folder %s' % index) for index in range(size)
+        ])
+        return self.env['project.project'].create([{
+            'name': 'Benchmark Project %s' % index,
+            'sale_line_id': order.order_line[0].id,
+            'documents_folder_id': folder.id,
+        } for index, (order, folder) in enumerate(zip(orders, folders))])
+
+    # ========================
+    # Benchmark 1: Calendar Event Rules
+    # ========================
+
+    def test_benchmark_assign_existing_customer(self):
+        """Benchmark customer assignment by phone, each event matching an existing customer"""
+        def make_records(size):
+            customers = self._create_customers(size)
+            events = self._create_events(size, customers=customers)
+            for event, customer in zip(events, customers):
+                event.with_context(skip_calendar_automation=True).x_studio_customer_phone = \
+                    '<a href="tel:%s">%s</a>' % (customer.phone, customer.phone)
+            return events
+
+        self._benchmark_rule('_assign_existing_customer', make_records,
+                             lambda events: events._assign_existing_customer())
+
+    def test_benchmark_set_initial_organizer(self):
+        """Benchmark organizer assignment"""
+        self._benchmark_rule('_set_initial_organizer', self._create_events,
+                             lambda events: events._set_initial_organizer())
+
+    def test_benchmark_update_clickable_from_attendee(self):
+        """Benchmark clickable address and phone generation"""
+        self._benchmark_rule('_update_clickable_from_attendee', self._create_events,
+                             lambda events: events._update_clickable_from_attendee())
+
+    def test_benchmark_replace_call_center_emails(self):
+        """Benchmark call center email replacement"""
+        self._benchmark_rule('_replace_call_center_emails', self._create_events,
+                             lambda events: events._replace_call_center_emails())
+
+    def test_benchmark_create_activity_noshow(self):
+        """Benchmark NoShow activity creation"""
+        self._benchmark_rule('_create_activity_noshow',
+                             lambda size: self._create_events(size, appointment_status='no_show'),
+                             lambda events: events._create_activity_noshow())
+
+    def test_benchmark_update_calendar_status_rescheduled(self):
+        """Benchmark rescheduling of NoShow events"""
+        def make_records(size):
+            events = self._create_events(size, appointment_status='no_show')
+            events._create_activity_noshow()
+            return events
+
+        self._benchmark_rule('_update_calendar_status_rescheduled', make_records,
+                             lambda events: events._update_calendar_status_rescheduled())
+
+    def test_benchmark_compute_automation_scope(self):
+        """Benchmark the automation scope computation"""
+        self._benchmark_rule('_compute_automation_scope', self._create_events,
+                             lambda events: events._compute_automation_scope())
+
+    def test_benchmark_compute_commercial(self):
+        """Benchmark the commercial computation"""
+        self._benchmark_rule('_compute_commercial', self._create_events,
+                             lambda events: events._compute_commercial())
+
+    # ========================
+    # Benchmark 2: Appointment Answer Rules
+    # ========================
+
+    def test_benchmark_add_conjoint_as_contact(self):
+        """Benchmark spouse contact creation"""
+        self._benchmark_rule('_add_conjoint_as_contact', self._create_answers,
+                             self._run_answer_rule('_add_conjoint_as_contact'))
+
+    def test_benchmark_update_contact_info(self):
+        """Benchmark partner address collection"""
+        self._benchmark_rule('_update_contact_info', self._create_answers,
+                             self._run_answer_rule('_update_contact_info'))
+
+    def test_benchmark_update_appointment_title(self):
+        """Benchmark appointment title building"""
+        self._benchmark_rule('_update_appointment_title', self._create_answers,
+                             self._run_answer_rule('_update_appointment_title'))
+
+    def test_benchmark_set_partner_on_behalf(self):
+        """Benchmark on-behalf partner assignment"""
+        self._benchmark_rule('_set_partner_on_behalf', self._create_answers,
+                             self._run_answer_rule('_set_partner_on_behalf'))
+
+    # ========================
+    # Benchmark 3: Project Rules
+    # ========================
+
+    def test_benchmark_update_project_folder_name(self):
+        """Benchmark project folder renaming, each project with its own sales order and folder"""
+        def make_records(size):
+            projects = self._create_sold_projects(size)
+            # The folders were renamed on create: give them back their original name
+            for index, project in enumerate(projects):
+                project.documents_folder_id.name = 'Benchmark Folder %s' % index
+            return projects
+
+        self._benchmark_rule('_update_project_folder_name', make_records,
+                             lambda projects: projects._update_project_folder_name(force=True))
+
+    def test_benchmark_set_welcome_call_deadline(self):
+        """Benchmark welcome call deadline computation on the create values of a batch, one project per task"""
+        def make_records(size):
+            return [{
+                'name': 'Welcom call',
+                'project_id': project.id,
+            } for project in self._create_sold_projects(size)]
+
+        def run(vals_list):
+            self.env['project.task']._set_welcome_call_deadline(vals_list)
+
+        self._benchmark_rule('_set_welcome_call_deadline', make_records, run)
@@ -216,6 +216,38 @@ class TestCalendarEvent(TransactionCase):
         self.assertEqual(event.appointment_status, 'booked',
                         "Appointment status should be reset to 'booked'")
 
+    def test_reschedule_multiple_events_in_one_write(self):
+        """Test that rescheduling several events at once closes all NoShow activities and resets all statuses"""
+        # Skip if appointment module not installed
+        if not self.appointment_type_call_center:
+            self.skipTest("Appointment module not installed")
+
+        events = self.env['calendar.event'].create([
+            {
+                'name': f'Planner Event {i}',
+                'start': datetime.datetime.now() + datetime.timedelta(hours=i),
+                'stop': datetime.datetime.now() + datetime.timedelta(hours=i + 1),
+                'appointment_type_id': self.appointment_type_call_center.id,
+            }
+            for i in range(3)
+        ])
+        events.write({'appointment_status': 'no_show'})
+
+        # Move the whole day in one write
+        events.write({
+            'start': datetime.datetime.now() + datetime.timedelta(days=1),
+            'stop': datetime.datetime.now() + datetime.timedelta(days=1, hours=1),
+        })
+
+        active_noshow = self.env['mail.activity'].search([
+            ('res_model', '=', 'calendar.event'),
+            ('res_id', 'in', events.ids),
+            ('activity_type_id', '=', self.noshow_activity_type.id),
+        ])
+        self.assertFalse(active_noshow, "All NoShow activities should be marked as done")
+        self.assertEqual(set(events.mapped('appointment_status')), {'booked'},
+                        "All rescheduled events should be reset to 'booked'")
+
     def test_reschedule_not_triggered_on_other_updates(self):
         """Test that reschedule logic only triggers on date/time changes"""
         # Skip if appointment module not installed
@@ -415,6 +447,32 @@ class TestCalendarEvent(TransactionCase):
         self.assertIn(self.customer_partner.id, attendee_partner_ids,
                      f"Existing customer (ID {self.customer_partner.id}) should be added as attendee. Found: {attendee_partner_ids}")
 
+    def test_find_existing_customer_ignores_other_country_numbers(self):
+        """Test that a customer sharing only the last 8 digits of another country's number is not matched"""
+        # Skip if appointment module not installed
+        if not self.appointment_type_commercial:
+            self.skipTest("Appointment module not installed")
+
+        french_customer = self.env['res.partner'].create({
+            'name': 'French Customer',
+            'phone': '+33 6 12 34 56 78',
+        })
+
+        event = self.env['calendar.event'].create({
+            'name': 'Test Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'x_studio_customer_phone': '<a href="tel:+32412345678">+32 412 34 56 78</a>',
+            'appointment_type_id': self.appointment_type_commercial.id,
+        })
+
+        self.assertIn(self.customer_partner, event.attendee_ids.partner_id,
+                     "Customer with the same international number should be added")
+        self.assertNotIn(french_customer, event.attendee_ids.partner_id,
+                        "Customer with another country's number should not be added")
+        self.assertFalse(french_customer.x_duplicate_of_id,
+                        "Customer with another country's number should not be marked as duplicate")
+
     def test_update_opportunity_with_customer(self):
         """Test that related opportunity is updated with found customer"""
         # Skip if appointment module not installed
@@ -475,6 +533,8 @@ class TestCalendarEvent(TransactionCase):
         attendee_partner_ids = [att.partner_id.id for att in event.attendee_ids]
         self.assertIn(self.customer_partner.id, attendee_partner_ids,
                      "Original customer should remain as attendee")
+        # Duplicates are only marked, the collection cron deletes them
+        self.assertTrue(duplicate_customer.exists(), "Duplicate should not be deleted by the rule")
 
     def test_skip_automation_context_flag(self):
         """Test that skip_calendar_automation context flag prevents recursion"""
@@ -497,10 +557,75 @@ class TestCalendarEvent(TransactionCase):
         self.assertEqual(len(event.attendee_ids), original_attendee_count,
                         "Automation should be skipped with context flag")
 
+    def test_rules_not_triggered_by_unrelated_fields(self):
+        """Test that writes on fields no rule listens to do not run the automation rules"""
+        # Skip if appointment module not installed
+        if not self.appointment_type_commercial:
+            self.skipTest("Appointment module not installed")
+
+        event = self.env['calendar.event'].create({
+            'name': 'Test Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'appointment_type_id': self.appointment_type_commercial.id,
+        })
+
+        # Set the phone without running the automation
+        event.with_context(skip_calendar_automation=True).write({
+            'x_studio_customer_phone': '<a href="tel:+32412345678">+32 412 34 56 78</a>',
+        })
+
+        # Description-only write does not trigger customer assignment
+        event.write({'description': 'Notes only'})
+        self.assertNotIn(self.customer_partner, event.attendee_ids.partner_id,
+                        "Customer assignment should not run for a description-only write")
+
+        # Writing the phone field triggers it
+        event.write({'x_studio_customer_phone': '<a href="tel:+32412345678">+32 412 34 56 78</a>'})
+        self.assertIn(self.customer_partner, event.attendee_ids.partner_id,
+                     "Customer assignment should run when its trigger field is written")
+
+    def test_clickable_fields_follow_assigned_customer(self):
+        """Test that the clickable fields are refreshed when a phone write assigns the customer"""
+        # Skip if appointment module not installed
+        if not self.appointment_type_commercial:
+            self.skipTest("Appointment module not installed")
+
+        event = self.env['calendar.event'].create({
+            'name': 'Test Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'appointment_type_id': self.appointment_type_commercial.id,
+        })
+
+        # Writing the phone adds the existing customer as attendee
+        event.write({'x_studio_customer_phone': '<a href="tel:0412345678">0412 34 56 78</a>'})
+        self.assertIn(self.customer_partner, event.attendee_ids.partner_id,
+                     "Existing customer should be added as attendee")
+
+        # The clickable rule ran on the new attendee in the same write
+        self.assertIn('123 Test Street', event.x_studio_customer_address or '',
+                     "Clickable address should come from the assigned customer")
+        self.assertIn('tel:+32412345678', event.x_studio_customer_phone or '',
+                     "Clickable phone should come from the assigned customer")
+
     # ========================
     # Test 6: Create Activity NoShow
     # ========================
 
+    def test_noshow_activity_type_lookup_ignores_language(self):
+        """Test that the NoShow activity type is found whatever the language that fills the cache"""
+        self.env['res.lang']._activate_lang('fr_BE')
+        self.noshow_activity_type.with_context(lang='fr_BE').name = 'Absence'
+
+        Event = self.env['calendar.event']
+        self.assertEqual(Event.with_context(lang='fr_BE')._get_noshow_activity_type_id(),
+                        self.noshow_activity_type.id,
+                        "NoShow type should be found from a user with a translated name")
+        self.assertEqual(Event.with_context(lang='en_US')._get_noshow_activity_type_id(),
+                        self.noshow_activity_type.id,
+                        "Cached NoShow type should be the same in every language")
+
     def test_noshow_activity_created(self):
         """Test that NoShow activity is created when status is no_show"""
         # Skip if appointment module not installed
@@ -557,6 +682,37 @@ class TestCalendarEvent(TransactionCase):
         self.assertEqual(activity.user_id.id, self.test_user_1.id,
                         "NoShow activity should be assigned to event organizer")
 
+    def test_noshow_activity_only_on_status_transition(self):
+        """Test that NoShow activity is left alone by writes that do not change the status to no_show"""
+        # Skip if appointment module not installed
+        if not self.appointment_type_call_center:
+            self.skipTest("Appointment module not installed")
+
+        event = self.env['calendar.event'].create({
+            'name': 'Test Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'appointment_type_id': self.appointment_type_call_center.id,
+        })
+        event.write({'appointment_status': 'no_show'})
+
+        activity = self.env['mail.activity'].search([
+            ('res_model', '=', 'calendar.event'),
+            ('res_id', '=', event.id),
+            ('activity_type_id', '=', self.noshow_activity_type.id),
+        ])
+        self.assertEqual(len(activity), 1, "NoShow activity should be created on transition")
+
+        # Move the deadline manually, then write again without a status transition
+        manual_deadline = datetime.date.today() + datetime.timedelta(days=5)
+        activity.write({'date_deadline': manual_deadline})
+
+        event.write({'description': 'Customer did not answer'})
+        event.write({'appointment_status': 'no_show'})
+
+        self.assertEqual(activity.date_deadline, manual_deadline,
+                        "Existing NoShow activity should not be rewritten without a status transition")
+
     def test_noshow_activity_not_created_for_other_status(self):
         """Test that NoShow activity is not created for other statuses"""
         # Skip if appointment module not installed
@@ -587,10 +743,79 @@ class TestCalendarEvent(TransactionCase):
 
     def test_commercial_computed_for_valid_appointment_types(self):
         """Test that commercial field is computed for specific appointment types"""
-        # This test would require setting up the commercial group (ID: 59)
-        # and creating users in that group, which may not exist in test environment
-        # Skipping detailed implementation as it depends on production data
-        pass
+        # Skip if appointment module not installed
+        if not self.appointment_type_commercial:
+            self.skipTest("Appointment module not installed")
+
+        # Point the Commercial group parameter to a test group
+        commercial_group = self.env['res.groups'].create({'name': 'Test Commercial Group'})
+        self.env['ir.model.data'].create({
+            'module': 'bgg_custom_dev',
+            'name': 'test_group_commercial',
+            'model': 'res.groups',
+            'res_id': commercial_group.id,
+        })
+        self.env['ir.config_parameter'].sudo().set_param(
+            'bgg_custom_dev.commercial_group_xmlid', 'bgg_custom_dev.test_group_commercial')
+
+        event = self.env['calendar.event'].create({
+            'name': 'Test Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'appointment_type_id': self.appointment_type_commercial.id,
+            'partner_ids': [(4, self.customer_partner.id), (4, self.test_user_2.partner_id.id)],
+        })
+        self.assertFalse(event.x_studio_commercial,
+                        "Commercial field should be empty without a commercial attendee")
+
+        # Adding the attendee's user to the group recomputes the stored field
+        self.test_user_2.write({'group_ids': [(4, commercial_group.id)]})
+        self.assertEqual(event.x_studio_commercial, self.test_user_2.partner_id.name,
+                        "Commercial field should be the attendee in the Commercial group")
+
+    def test_commercial_follows_group_parameter(self):
+        """Test that commercial field follows the Commercial group parameter, implied groups and renames"""
+        # Skip if appointment module not installed
+        if not self.appointment_type_commercial:
+            self.skipTest("Appointment module not installed")
+
+        # The attendee's user only gets the Commercial group through an implying group
+        commercial_group = self.env['res.groups'].create({'name': 'Test Commercial Group'})
+        manager_group = self.env['res.groups'].create({
+            'name': 'Test Commercial Manager Group',
+            'implied_ids': [(4, commercial_group.id)],
+        })
+        self.env['ir.model.data'].create({
+            'module': 'bgg_custom_dev',
+            'name': 'test_group_commercial',
+            'model': 'res.groups',
+            'res_id': commercial_group.id,
+        })
+        self.test_user_2.write({'group_ids': [(4, manager_group.id)]})
+        self.env['ir.config_parameter'].sudo().search([
+            ('key', '=', 'bgg_custom_dev.commercial_group_xmlid'),
+        ]).unlink()
+
+        event = self.env['calendar.event'].create({
+            'name': 'Test Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'appointment_type_id': self.appointment_type_commercial.id,
+            'partner_ids': [(4, self.customer_partner.id), (4, self.test_user_2.partner_id.id)],
+        })
+        self.assertFalse(event.x_studio_commercial,
+                        "Commercial field should stay empty while the parameter is not set")
+
+        # Setting the parameter recomputes the stored field of existing events
+        self.env['ir.config_parameter'].sudo().set_param(
+            'bgg_custom_dev.commercial_group_xmlid', 'bgg_custom_dev.test_group_commercial')
+        self.assertEqual(event.x_studio_commercial, self.test_user_2.partner_id.name,
+                        "Commercial field should be the attendee with the implied Commercial group")
+
+        # Renaming the commercial updates the stored name
+        self.test_user_2.partner_id.name = 'Renamed Commercial'
+        self.assertEqual(event.x_studio_commercial, 'Renamed Commercial',
+                        "Commercial field should follow the commercial's name")
 
     def test_commercial_not_computed_for_other_types(self):
         """Test that commercial field is not computed for other appointment types"""
@@ -610,6 +835,84 @@ class TestCalendarEvent(TransactionCase):
         self.assertFalse(event.x_studio_commercial,
                         "Commercial field should be False for non-commercial appointment types")
 
+    # ========================
+    # Test 8: Stored Field - x_automation_scope
+    # ========================
+
+    def test_automation_scope_from_appointment_ref(self):
+        """Test that the automation scope is derived from the appointment type reference"""
+        # Skip if appointment module not installed
+        if not self.appointment_type_call_center:
+            self.skipTest("Appointment module not installed")
+
+        events = self.env['calendar.event'].create([
+            {
+                'name': f'Scope Event {appointment_type.name}',
+                'start': datetime.datetime.now(),
+                'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+                'appointment_type_id': appointment_type.id,
+            }
+            for appointment_type in (self.appointment_type_call_center,
+                                     self.appointment_type_commercial,
+                                     self.appointment_type_1)
+        ])
+
+        self.assertEqual(events.mapped('x_automation_scope'), ['call_center', 'commercial', 'none'],
+                        "Scope should follow the appointment type reference")
+
+        # Scope follows changes of the appointment type reference
+        self.appointment_type_1.x_appointment_ref = 'APT-NISOL-CNT'
+        self.assertEqual(events[2].x_automation_scope, 'call_center',
+                        "Scope should be recomputed when the reference changes")
+
+        # Scoped events can be filtered in SQL
+        self.assertIn(events[0], self.env['calendar.event'].search([('x_automation_scope', '=', 'call_center')]),
+                     "Scope should be searchable")
+
+    # ========================
+    # Test 9: Structured Title Parts
+    # ========================
+
+    def test_compose_title_from_parts(self):
+        """Test the title is composed from its parts, empty parts left out"""
+        event = self.env['calendar.event'].create({
+            'name': 'Test Event',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'x_title_client': 'Dupont / Martin',
+            'x_title_zip': '1000',
+            'x_title_need': 'PAC',
+            'x_title_sms': True,
+        })
+
+        self.assertEqual(event._compose_title(), '📞Dupont / Martin/1000/PAC',
+                        "Title should be composed from the stored parts")
+        self.assertEqual(event._compose_title({'x_title_zip': '4000', 'x_title_sms': False}),
+                        'Dupont / Martin/4000/PAC',
+                        "Given values should override the stored parts")
+
+        # A part is updated independently of the others, without parsing the title
+        event.x_title_zip = '5000'
+        self.assertEqual(event.name, '📞Dupont / Martin/5000/PAC', "Title should be recomposed")
+
+    def test_recompose_titles_batch(self):
+        """Test a part written on several events recomposes each title, grouped by new title"""
+        events = self.env['calendar.event'].create([{
+            'name': f'Batch Title Event {index}',
+            'start': datetime.datetime.now(),
+            'stop': datetime.datetime.now() + datetime.timedelta(hours=1),
+            'x_title_client': client,
+            'x_title_zip': '1000',
+        } for index, client in enumerate(['Dupont', 'Dupont', 'Martin'])])
+
+        events.write({'x_title_need': 'PAC'})
+        self.assertEqual(events.mapped('name'), ['Dupont/1000/PAC', 'Dupont/1000/PAC', 'Martin/1000/PAC'],
+                        "Each title should be recomposed from its own parts")
+
+        # An explicit title wins over the parts
+        events[0].write({'name': 'Manual Title', 'x_title_zip': '4000'})
+        self.assertEqual(events[0].name, 'Manual Title', "Written title should be kept")
+
     # ========================
     # Integration Tests
     # ========================
@@ -194,6 +194,25 @@ class TestProjectProject(TransactionCase):
         self.assertTrue(documents_folder.name.endswith(self.test_customer.name),
                        "Folder name should end with customer name")
 
+    def test_folder_rename_only_for_projects_created_in_transaction(self):
+        """Test projects created in an earlier transaction are not processed again"""
+        documents_folder = self.env['documents.folder'].create({
+            'name': 'Original Folder Name',
+        })
+        project = self.env['project.project'].create({
+            'name': 'Old Project',
+            'sale_line_id': self.sale_order_line.id,
+            'documents_folder_id': documents_folder.id,
+        })
+        documents_folder.write({'name': 'Manually Changed Name'})
+
+        # Simulate a later transaction: the creation marker is cleared on commit
+        self.env.cr.postcommit.data.pop('bgg_custom_dev.new_records.project.project', None)
+        project._update_project_folder_name()
+
+        self.assertEqual(documents_folder.name, 'Manually Changed Name',
+                        "Projects created in an earlier transaction should not be processed")
+
     # ========================
     # Integration Tests
     # ========================
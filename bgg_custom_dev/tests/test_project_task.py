@@ -240,6 +240,36 @@ class TestProjectTask(TransactionCase):
         self.assertEqual(task_deadline, expected_deadline,
                         "Deadline should be set even without project")
 
+    def test_welcome_call_deadline_in_create_values(self):
+        """Test the deadline is set in the create values, before the task is inserted"""
+        vals_list = [
+            {'name': 'Welcom call', 'project_id': self.test_project.id},
+            {'name': 'Other Task', 'project_id': self.test_project.id},
+        ]
+
+        self.env['project.task']._set_welcome_call_deadline(vals_list)
+
+        self.assertEqual(vals_list[0].get('date_deadline'),
+                        self.sale_order.date_order + datetime.timedelta(days=2),
+                        "Welcome call values should get the deadline")
+        self.assertNotIn('date_deadline', vals_list[1], "Other task values should not be changed")
+
+    def test_welcome_call_marker_carried_by_copy(self):
+        """Test a renamed template task still gets the deadline through its marker"""
+        template_project = self.env['project.project'].create({'name': 'Template Project'})
+        template_task = self.env['project.task'].create({
+            'name': 'Welcom call',
+            'project_id': template_project.id,
+        })
+        self.assertTrue(template_task.x_is_welcome_call, "Task named Welcom call should be marked")
+
+        template_task.name = 'Appel de bienvenue'
+        task = template_task.copy({'project_id': self.test_project.id})
+
+        self.assertTrue(task.x_is_welcome_call, "Marker should be copied from the template")
+        self.assertEqual(task.date_deadline, self.sale_order.date_order + datetime.timedelta(days=2),
+                        "Renamed welcome call should get the deadline")
+
     # ========================
     # Integration Tests
     # ========================
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+from odoo.tests import tagged
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestResPartner(TransactionCase):
+    """
+    Test suite for res.partner model extensions
+    Tests the normalized phone keys used for customer matching
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.country_belgium = cls.env.ref('base.be')
+
+    # ========================
+    # Test 1: Normalized Phone Keys
+    # ========================
+
+    def test_phone_keys_international_number(self):
+        """Test keys computed from an international number with spaces"""
+        partner = self.env['res.partner'].create({
+            'name': 'International Phone',
+            'phone': '+32 412 34 56 78',
+        })
+
+        self.assertEqual(partner.x_phone_e164, '+32412345678',
+                        "E.164 key should contain only the international digits")
+        self.assertEqual(partner.x_phone_suffix, '12345678',
+                        "Suffix key should be the last 8 digits")
+
+    def test_phone_keys_national_number(self):
+        """Test national numbers are expanded with the country calling code"""
+        partner = self.env['res.partner'].create({
+            'name': 'National Phone',
+            'phone': '0412 34 56 78',
+            'country_id': self.country_belgium.id,
+        })
+
+        self.assertEqual(partner.x_phone_e164, '+32412345678',
+                        "National number should be expanded with the Belgian calling code")
+        self.assertEqual(partner.x_phone_suffix, '12345678',
+                        "Suffix key should be the last 8 digits")
+
+    def test_phone_keys_national_number_company_country(self):
+        """Test national numbers fall back on the calling code of the partner's company country"""
+        company = self.env['res.company'].create({
+            'name': 'Belgian Company',
+            'country_id': self.country_belgium.id,
+        })
+        partner = self.env['res.partner'].create({
+            'name': 'Company National Phone',
+            'phone': '0412 34 56 78',
+            'company_id': company.id,
+        })
+
+        self.assertEqual(partner.x_phone_e164, '+32412345678',
+                        "National number should be expanded with the company's calling code")
+
+    def test_phone_keys_follow_phone_changes(self):
+        """Test keys are maintained on write and cleared for short numbers"""
+        partner = self.env['res.partner'].create({
+            'name': 'Changing Phone',
+            'phone': '0032 487 65 43 21',
+        })
+        self.assertEqual(partner.x_phone_e164, '+32487654321',
+                        "00 prefix should be read as international")
+
+        partner.write({'phone': '1234'})
+        self.assertFalse(partner.x_phone_suffix, "Short numbers should have no suffix key")
+        self.assertFalse(partner.x_phone_e164, "Short numbers should have no E.164 key")
+
+    def test_phone_suffix_search(self):
+        """Test customers can be matched by equality on the suffix key"""
+        partner = self.env['res.partner'].create({
+            'name': 'Searchable Phone',
+            'phone': '+32 499 11 22 33',
+        })
+
+        found = self.env['res.partner'].search([('x_phone_suffix', '=', '99112233')])
+        self.assertIn(partner, found, "Partner should be found by its phone suffix")
+
+    # ========================
+    # Test 2: Internal Flag
+    # ========================
+
+    def test_is_internal_follows_users(self):
+        """Test the internal flag follows user creation and archiving"""
+        user = self.env['res.users'].create({
+            'name': 'Internal Flag User',
+            'login': 'internal_flag_user',
+        })
+        self.assertTrue(user.partner_id.x_is_internal,
+                       "Partner of an internal user should be flagged internal")
+
+        user.write({'active': False})
+        self.assertFalse(user.partner_id.x_is_internal,
+                        "Partner of an archived user should not be flagged internal")
+
+    def test_is_internal_not_set_for_portal_users(self):
+        """Test portal users and plain contacts are not internal"""
+        portal_user = self.env['res.users'].create({
+            'name': 'Portal Flag User',
+            'login': 'portal_flag_user',
+            'group_ids': [(6, 0, [self.env.ref('base.group_portal').id])],
+        })
+        contact = self.env['res.partner'].create({'name': 'Plain Contact'})
+
+        self.assertFalse(portal_user.partner_id.x_is_internal,
+                        "Portal user partner should not be internal")
+        self.assertFalse(contact.x_is_internal,
+                        "Contact without user should not be internal")
+        self.assertIn(contact, self.env['res.partner'].search([('x_is_internal', '=', False)]),
+                     "Non-internal contacts should be found with a domain on the flag")
+
+    # ========================
+    # Test 3: Reference Checks
+    # ========================
+
+    def test_referenced_partner_ids(self):
+        """Test references from events, attendees and leads are found in one call"""
+        partners = self.env['res.partner'].create([
+            {'name': 'Lead Customer'},
+            {'name': 'Attendee Customer'},
+            {'name': 'Unused Customer'},
+        ])
+        lead_partner, attendee_partner, unused_partner = partners
+
+        self.env['crm.lead'].create({
+            'name': 'Reference Lead',
+            'partner_id': lead_partner.id,
+        })
+        event = self.env['calendar.event'].create({
+            'name': 'Reference Event',
+            'start': '2024-01-15 10:00:00',
+            'stop': '2024-01-15 11:00:00',
+            'partner_ids': [(4, attendee_partner.id)],
+        })
+
+        referenced_ids = partners._get_referenced_partner_ids()
+        self.assertIn(lead_partner.id, referenced_ids, "Lead customer should be referenced")
+        self.assertIn(attendee_partner.id, referenced_ids, "Attendee should be referenced")
+        self.assertNotIn(unused_partner.id, referenced_ids, "Unused partner should not be referenced")
+
+        # References from an excluded event are ignored
+        referenced_ids = partners._get_referenced_partner_ids(exclude_event_ids=event.ids)
+        self.assertNotIn(attendee_partner.id, referenced_ids,
+                        "Attendee of the excluded event should not be referenced")
+
+    # ========================
+    # Test 4: Duplicate Partner Collection
+    # ========================
+
+    def test_collect_duplicate_partners(self):
+        """Test marked duplicates are deleted only when still unused"""
+        customer = self.env['res.partner'].create({'name': 'Kept Customer'})
+        unused_duplicate, used_duplicate = self.env['res.partner'].create([
+            {'name': 'Unused Duplicate'},
+            {'name': 'Used Duplicate'},
+        ])
+        (unused_duplicate | used_duplicate)._mark_as_duplicate_of(customer)
+        self.assertEqual(unused_duplicate.x_duplicate_of_id, customer, "Duplicate should be marked")
+
+        # The second duplicate got referenced again after being marked
+        self.env['crm.lead'].create({
+            'name': 'Late Lead',
+            'partner_id': used_duplicate.id,
+        })
+
+        removed = self.env['res.partner']._cron_collect_duplicate_partners()
+
+        self.assertEqual([line[0] for line in removed], [unused_duplicate.id],
+                        "Only the unused duplicate should be reported as removed")
+        self.assertFalse(unused_duplicate.exists(), "Unused duplicate should be deleted")
+        self.assertTrue(used_duplicate.exists(), "Referenced duplicate should be kept")
+        self.assertFalse(used_duplicate.x_duplicate_of_id, "Referenced duplicate should be unmarked")
+        self.assertTrue(customer.exists(), "Customer should never be deleted")
+
+    # ========================
+    # Test 5: Phone Bucket Deduplication
+    # ========================
+
+    def _create_phone_bucket(self):
+        customer = self.env['res.partner'].create({
+            'name': 'Oldest Customer',
+            'phone': '+32 470 11 22 33',
+        })
+        duplicate = self.env['res.partner'].create({
+            'name': 'Newer Customer',
+            'phone': '0470 11 22 33',
+            'country_id': self.country_belgium.id,
+        })
+        event = self.env['calendar.event'].with_context(skip_calendar_automation=True).create({
+            'name': 'Duplicate Event',
+            'start': '2024-01-15 10:00:00',
+            'stop': '2024-01-15 11:00:00',
+            'partner_ids': [(4, duplicate.id)],
+        })
+        lead = self.env['crm.lead'].create({
+            'name': 'Duplicate Lead',
+            'partner_id': duplicate.id,
+        })
+        return customer, duplicate, event, lead
+
+    def test_dedup_phone_buckets_dry_run(self):
+        """Test the dry run reports the bucket without changing anything"""
+        customer, duplicate, event, lead = self._create_phone_bucket()
+
+        report = self.env['res.partner']._dedup_phone_buckets(['70112233'], dry_run=True)
+
+        self.assertEqual(report, [{
+            'suffix': '70112233',
+            'customer_id': customer.id,
+            'duplicate_ids': duplicate.ids,
+            'event_count': 1,
+            'lead_count': 1,
+        }], "Dry run should report the kept customer and its duplicate")
+        self.assertIn(duplicate, event.partner_ids, "Dry run should not change events")
+        self.assertEqual(lead.partner_id, duplicate, "Dry run should not change opportunities")
+        self.assertFalse(duplicate.x_duplicate_of_id, "Dry run should not mark duplicates")
+
+    def test_cron_dedup_phone_buckets_dry_run_saves_report(self):
+        """Test the scheduled dry run saves its report, since the returned report is dropped"""
+        customer, duplicate, event, lead = self._create_phone_bucket()
+
+        self.env['res.partner']._cron_dedup_phone_buckets(dry_run=True)
+
+        attachment = self.env['ir.attachment'].search([('name', '=like', 'phone_dedup_dry_run_%')],
+                                                      order='id desc', limit=1)
+        self.assertTrue(attachment, "Dry run should save its report as an attachment")
+        self.assertIn(f"70112233,{customer.id},{duplicate.id},1,1", attachment.raw.decode(),
+                     "Report should list the kept customer, duplicates and counts of the bucket")
+        self.assertFalse(duplicate.x_duplicate_of_id, "Dry run should not mark duplicates")
+
+    def test_dedup_phone_buckets_moves_organizer(self):
+        """Test events organized by a duplicate move to the kept customer, so the duplicate can be collected"""
+        customer, duplicate, event, lead = self._create_phone_bucket()
+        organized_event = self.env['calendar.event'].with_context(skip_calendar_automation=True).create({
+            'name': 'Organized By Duplicate',
+            'start': '2024-01-16 10:00:00',
+            'stop': '2024-01-16 11:00:00',
+            'partner_id': duplicate.id,
+            'partner_ids': [(4, customer.id)],
+        })
+
+        self.env['res.partner']._cron_dedup_phone_buckets()
+
+        self.assertEqual(organized_event.partner_id, customer, "Organizer should move to the kept customer")
+        self.assertFalse(duplicate._get_referenced_partner_ids(), "Duplicate should no longer be referenced")
+
+        self.env['res.partner']._cron_collect_duplicate_partners()
+        self.assertFalse(duplicate.exists(), "Duplicate should be collected")
+
+    def test_dedup_phone_buckets(self):
+        """Test events and opportunities move to the oldest customer and the duplicate is marked"""
+        customer, duplicate, event, lead = self._create_phone_bucket()
+
+        self.env['res.partner']._cron_dedup_phone_buckets()
+
+        self.assertIn(customer, event.partner_ids, "Oldest customer should be added to the event")
+        self.assertNotIn(duplicate, event.partner_ids, "Duplicate should be removed from the event")
+        self.assertNotIn(duplicate, event.attendee_ids.partner_id, "Duplicate should not stay attendee")
+        self.assertEqual(lead.partner_id, customer, "Opportunity should move to the oldest customer")
+        self.assertEqual(duplicate.x_duplicate_of_id, customer, "Duplicate should be marked for collection")
+        self.assertFalse(self.env['ir.config_parameter'].get_param('bgg_custom_dev.phone_dedup_cursor'),
+                        "Cursor should be reset once every bucket is processed")
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+from odoo.tests import tagged
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestResUsers(TransactionCase):
+    """
+    Test suite for res.users model extensions
+    Tests the cached set of internal user emails
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.internal_user = cls.env['res.users'].create({
+            'name': 'Cached Email User',
+            'login': 'cached_email_user',
+            'email': 'Cached.User@Example.com ',
+        })
+
+    # ========================
+    # Test 1: Internal Email Cache
+    # ========================
+
+    def test_internal_emails_normalized(self):
+        """Test internal user emails are stripped and lowercased"""
+        self.assertIn('cached.user@example.com', self.env['res.users']._get_internal_emails(),
+                     "Internal user email should be in the normalized set")
+
+    def test_internal_emails_follow_partner_email(self):
+        """Test the cache is invalidated when the user's partner email changes"""
+        self.env['res.users']._get_internal_emails()
+
+        self.internal_user.partner_id.write({'email': 'renamed.user@example.com'})
+
+        internal_emails = self.env['res.users']._get_internal_emails()
+        self.assertIn('renamed.user@example.com', internal_emails,
+                     "New partner email should be in the set")
+        self.assertNotIn('cached.user@example.com', internal_emails,
+                        "Old email should no longer be in the set")
+
+    def test_internal_emails_follow_deactivation(self):
+        """Test the cache is invalidated when the user is archived"""
+        self.env['res.users']._get_internal_emails()
+
+        self.internal_user.write({'active': False})
+
+        self.assertNotIn('cached.user@example.com', self.env['res.users']._get_internal_emails(),
+                        "Archived user email should no longer be in the set")
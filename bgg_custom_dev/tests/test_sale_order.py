@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+from odoo.tests.common import TransactionCase
+from odoo.tests import tagged
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestSaleOrder(TransactionCase):
+    """
+    Test suite for sale.order model extensions
+    Tests the welcome call deadline update when orders are re-dated
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_customer = cls.env['res.partner'].create({
+            'name': 'Test Customer For Order',
+        })
+
+        cls.test_product = cls.env['product.product'].create({
+            'name': 'Order Service Product',
+            'type': 'service',
+            'service_tracking': 'task_in_project',
+            'list_price': 1500.0,
+        })
+
+        cls.sale_order = cls.env['sale.order'].create({
+            'partner_id': cls.test_customer.id,
+            'order_line': [(0, 0, {
+                'product_id': cls.test_product.id,
+                'product_uom_qty': 1,
+                'price_unit': 1500.0,
+            })],
+        })
+        cls.sale_order.action_confirm()
+
+        cls.test_project = cls.env['project.project'].create({
+            'name': 'Test Project For Order',
+            'sale_line_id': cls.sale_order.order_line[0].id,
+        })
+
+    # ========================
+    # Test 1: Update Welcome Call Deadlines
+    # ========================
+
+    def test_redating_order_moves_open_welcome_calls(self):
+        """Test open welcome call deadlines follow the order date, other tasks are left alone"""
+        welcome_call, done_welcome_call, other_task = self.env['project.task'].create([
+            {'name': 'Welcom call', 'project_id': self.test_project.id},
+            {'name': 'Welcom call', 'project_id': self.test_project.id},
+            {'name': 'Other Task', 'project_id': self.test_project.id},
+        ])
+        done_welcome_call.state = '1_done'
+        done_deadline = done_welcome_call.date_deadline
+
+        new_date = datetime.datetime(2024, 5, 31, 10, 0, 0)
+        self.sale_order.write({'date_order': new_date})
+
+        self.assertEqual(welcome_call.date_deadline, new_date + datetime.timedelta(days=2),
+                        "Open welcome call deadline should follow the new order date")
+        self.assertEqual(done_welcome_call.date_deadline, done_deadline,
+                        "Closed welcome call should keep its deadline")
+        self.assertFalse(other_task.date_deadline, "Other tasks should not get a deadline")
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from .rule_stats import automation_rule, get_rule_stats, reset_rule_stats
+from .new_records import filter_new_records, mark_new_records
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+# Records created in the current transaction are remembered in the cursor's postcommit data,
+# which is only cleared after a commit or on a rollback (the precommit data is also cleared by
+# every flush, hence by every savepoint)
+
+
+def _new_records_key(model_name):
+    return 'bgg_custom_dev.new_records.%s' % model_name
+
+
+def mark_new_records(records):
+    """Remember records as created in the current transaction"""
+    new_ids = records.env.cr.postcommit.data.setdefault(_new_records_key(records._name), set())
+    new_ids.update(records.ids)
+
+
+def filter_new_records(records):
+    """Return the records created in the current transaction"""
+    new_ids = records.env.cr.postcommit.data.get(_new_records_key(records._name), ())
+    return records.filtered(lambda record: record.id in new_ids)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+from odoo.models import BaseModel
+from odoo.tools import config
+
+# One compact record per rule execution, at debug level:
+# --log-handler=odoo.addons.bgg_custom_dev.rules:DEBUG
+_rule_logger = logging.getLogger('odoo.addons.bgg_custom_dev.rules')
+
+# Odoo configuration key: share of the rule executions logged when debug is enabled (0 to 1)
+LOG_SAMPLE_RATE_KEY = 'bgg_rule_log_sample_rate'
+
+# Number of record IDs written in a rule log record
+LOGGED_IDS_LIMIT = 10
+
+# Number of most recent invocations kept per rule to compute the percentiles
+RESERVOIR_SIZE = 1000
+
+PERCENTILES = (50, 95, 99)
+
+# In-memory statistics of the current worker process, shared by its threads
+_lock = threading.Lock()
+_rule_samples = defaultdict(lambda: deque(maxlen=RESERVOIR_SIZE))
+_rule_calls = defaultdict(int)
+
+
+def automation_rule(method):
+    """
+    Decorator recording the wall time, SQL query count and SQL time of each call of an automation rule
+    Times are inclusive: nested rules and ORM flushes run during the call are counted in it
+    When the rules logger is at debug level, a sample of the calls also emits one structured log record
+    """
+    rule_name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cr = self.env.cr
+        thread = threading.current_thread()
+        log_call = _rule_logger.isEnabledFor(logging.DEBUG) and _is_sampled()
+        pending_writes = _pending_writes(self.env) if log_call else None
+        outcome = 'error'
+        query_count = cr.sql_log_count
+        query_time = getattr(thread, 'query_time', 0.0)
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+            outcome = 'done'
+            return result
+        finally:
+            wall_time = time.perf_counter() - start
+            rule_query_count = cr.sql_log_count - query_count
+            _record_sample(
+                rule_name,
+                wall_time,
+                rule_query_count,
+                getattr(thread, 'query_time', 0.0) - query_time,
+            )
+            if log_call:
+                records = self or next((arg for arg in args if isinstance(arg, BaseModel)), self)
+                changed_fields = sorted(
+                    str(field) for field, count in _pending_writes(self.env).items()
+                    if count > pending_writes.get(field, 0)
+                )
+                _rule_logger.debug(
+                    "rule=%s model=%s ids=%s count=%s outcome=%s changed=%s duration_ms=%.1f queries=%s",
+                    rule_name, records._name, records.ids[:LOGGED_IDS_LIMIT], len(records), outcome,
+                    ','.join(changed_fields) or '-', wall_time * 1000, rule_query_count,
+                )
+
+    return wrapper
+
+
+def _is_sampled():
+    sample_rate = float(config.get(LOG_SAMPLE_RATE_KEY, 1.0))
+    return sample_rate >= 1.0 or random.random() < sample_rate
+
+
+def _pending_writes(env):
+    """Return {field: number of records} of the field values written but not flushed yet"""
+    field_dirty = getattr(env.transaction, 'field_dirty', {})
+    return {field: len(ids) for field, ids in field_dirty.items()}
+
+
+def _record_sample(rule_name, wall_time, query_count, query_time):
+    with _lock:
+        _rule_calls[rule_name] += 1
+        _rule_samples[rule_name].append((wall_time, query_count, query_time))
+
+
+def _percentiles(values):
+    """Nearest-rank percentiles of a list of values"""
+    values = sorted(values)
+    return {
+        'p%s' % percentile: values[max(0, math.ceil(percentile / 100 * len(values)) - 1)]
+        for percentile in PERCENTILES
+    }
+
+
+def get_rule_stats():
+    """
+    Return the statistics of every instrumented rule run by the current worker
+
+    Returns:
+        dict: {rule_name: {'calls', 'samples', 'wall_time', 'query_count', 'query_time'}} where the last
+              three map p50/p95/p99 to the value over the last RESERVOIR_SIZE calls (times in seconds)
+    """
+    with _lock:
+        snapshot = {rule_name: (_rule_calls[rule_name], list(samples)) for rule_name, samples in _rule_samples.items()}
+
+    stats = {}
+    for rule_name, (calls, samples) in snapshot.items():
+        wall_times, query_counts, query_times = zip(*samples)
+        stats[rule_name] = {
+            'calls': calls,
+            'samples': len(samples),
+            'wall_time': _percentiles(wall_times),
+            'query_count': _percentiles(query_counts),
+            'query_time': _percentiles(query_times),
+        }
+    return stats
+
+
+def reset_rule_stats():
+    """Forget the statistics of the current worker"""
+    with _lock:
+        _rule_calls.clear()
+        _rule_samples.clear()